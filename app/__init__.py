@@ -1,3 +1,6 @@
+import os
+import threading
+import weakref
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
@@ -8,22 +11,27 @@ db = SQLAlchemy()
 login_manager = LoginManager()
 migrate = Migrate()
 
-def create_app(config_name='default'):
-    """Application factory"""
-    app = Flask(__name__)
-    app.config.from_object(config[config_name])
-    
-    # Initialize extensions
-    db.init_app(app)
-    login_manager.init_app(app)
-    migrate.init_app(app, db)
-    
-    # Login manager configuration
-    login_manager.login_view = 'auth.login'
-    login_manager.login_message = 'Veuillez vous connecter pour accéder à cette page.'
-    login_manager.login_message_category = 'info'
-    
-    # Register blueprints
+# Apps created in this process, for the fork hook below
+_apps = weakref.WeakSet()
+
+def _dispose_engines_after_fork():
+    """Forget the connection pools inherited from the parent process
+
+    Pre-forking servers (gunicorn with preload_app) create the app, and may
+    open connections, before forking workers. A socket shared by two
+    processes corrupts both sessions, so each child starts with empty pools;
+    close=False leaves the parent's connections untouched.
+    """
+    for app in list(_apps):
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose(close=False)
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_dispose_engines_after_fork)
+
+def register_blueprints(app):
+    """Import the route modules and register their blueprints"""
     from app.routes.auth import auth_bp
     from app.routes.main import main_bp
     from app.routes.podcasts import podcasts_bp
@@ -39,9 +47,77 @@ def create_app(config_name='default'):
     app.register_blueprint(campaigns_bp)
     app.register_blueprint(deals_bp)
     app.register_blueprint(analytics_bp)
+
+class _LazyRoutes:
+    """WSGI wrapper registering the blueprints when the first request comes in"""
+
+    def __init__(self, app):
+        self.app = app
+        self.wsgi_app = app.wsgi_app
+        self.loaded = False
+        self.lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        if not self.loaded:
+            with self.lock:
+                if not self.loaded:
+                    register_blueprints(self.app)
+                    self.loaded = True
+        return self.wsgi_app(environ, start_response)
+
+def create_app(config_name='default', lazy_routes=False):
+    """Application factory
+
+    With ``lazy_routes`` the route modules are only imported and registered
+    when the first request comes in, so CLI commands and the shell, which
+    never serve requests, start without them. ``url_for`` is unavailable
+    until then; call ``register_blueprints(app)`` to load them explicitly.
+    """
+    app = Flask(__name__)
+    app.config.from_object(config[config_name])
+    
+    # Initialize extensions
+    from app.utils.engine import engine_options, init_engines
+    engine_options(app)
+    db.init_app(app)
+    init_engines(app, db)
+    login_manager.init_app(app)
+    migrate.init_app(app, db)
+    
+    from app.utils.search import search_index
+    search_index.init_app(app)
+    
+    from app.utils.cache import response_cache
+    response_cache.init_app(app)
+    
+    from app.utils.querycount import init_query_counter
+    init_query_counter(app)
+    
+    from app.utils.instrumentation import init_instrumentation
+    init_instrumentation(app)
+    
+    from app.utils.slowlog import init_slow_query_log
+    init_slow_query_log(app, db)
+    
+    # Models register their tables (create_all, migrations) and the user
+    # loader, whether or not the routes are loaded
+    from app import models
+    
+    # Login manager configuration
+    login_manager.login_view = 'auth.login'
+    login_manager.login_message = 'Veuillez vous connecter pour accéder à cette page.'
+    login_manager.login_message_category = 'info'
+    
+    if lazy_routes:
+        app.wsgi_app = _LazyRoutes(app)
+    else:
+        register_blueprints(app)
     
-    # Create tables
-    with app.app_context():
-        db.create_all()
+    # The schema is managed by migrations (flask db upgrade); serving
+    # processes never issue DDL. Throwaway dev/test databases may opt in.
+    if app.config['AUTO_CREATE_SCHEMA'] and (app.debug or app.testing):
+        with app.app_context():
+            db.create_all()
     
+    _apps.add(app)
     return app
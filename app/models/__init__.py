@@ -4,5 +4,11 @@ from app.models.brand import Brand
 from app.models.campaign import Campaign
 from app.models.deal import Deal
 from app.models.tracking import AdPerformance
+from app.models.rollup import CampaignDailyStats, PodcastDailyStats, BrandDailyStats
+from app.models.spend import SpendEntry, BrandMonthlySpend
 
-__all__ = ['User', 'Podcast', 'Brand', 'Campaign', 'Deal', 'AdPerformance']
+__all__ = [
+    'User', 'Podcast', 'Brand', 'Campaign', 'Deal', 'AdPerformance',
+    'CampaignDailyStats', 'PodcastDailyStats', 'BrandDailyStats',
+    'SpendEntry', 'BrandMonthlySpend'
+]
@@ -1,9 +1,15 @@
 from datetime import datetime
 from app import db
+from app.models.campaign import CampaignCountersMixin
+from app.models.types import JSONType
 
-class Brand(db.Model):
+class Brand(CampaignCountersMixin, db.Model):
     """Brand model"""
     __tablename__ = 'brands'
+    __table_args__ = (
+        db.Index('ix_brands_user_id_created_at', 'user_id', 'created_at'),
+        db.Index('ix_brands_is_active_created_at', 'is_active', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -22,14 +28,14 @@ class Brand(db.Model):
     contact_phone = db.Column(db.String(20))
     
     # Target audience
-    target_demographics = db.Column(db.Text)  # JSON stored as string
+    target_demographics = db.Column(JSONType)  # Same shape as Podcast.audience_demographics
     
     # Budget
     monthly_budget = db.Column(db.Float)
-    total_spent = db.Column(db.Float, default=0)
+    total_spent = db.Column(db.Float, default=0)  # Delivered cost, same as Podcast.total_revenue
     
     # Preferences
-    preferred_categories = db.Column(db.Text)  # JSON array of categories
+    preferred_categories = db.Column(JSONType)  # Array of categories
     
     # Links
     website_url = db.Column(db.String(500))
@@ -56,6 +62,8 @@ class Brand(db.Model):
             'industry': self.industry,
             'company_size': self.company_size,
             'contact_email': self.contact_email,
+            'target_demographics': self.target_demographics,
+            'preferred_categories': self.preferred_categories,
             'monthly_budget': self.monthly_budget,
             'total_spent': self.total_spent,
             'website_url': self.website_url,
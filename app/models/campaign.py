@@ -1,9 +1,33 @@
 from datetime import datetime
 from app import db
 
+class CampaignCountersMixin:
+    """Denormalized campaign counts of a podcast or brand
+
+    Maintained by app.utils.counters.update_campaign_counters on every
+    campaign status, rate or delivery change; ``flask recount`` recomputes
+    them from the campaigns table.
+    """
+
+    total_campaigns = db.Column(db.Integer, nullable=False, default=0)
+    pending_campaigns = db.Column(db.Integer, nullable=False, default=0)
+    active_campaigns = db.Column(db.Integer, nullable=False, default=0)
+    completed_campaigns = db.Column(db.Integer, nullable=False, default=0)
+
+    COUNTED_STATUSES = ('pending', 'active', 'completed')
+
 class Campaign(db.Model):
     """Campaign model for advertising campaigns"""
     __tablename__ = 'campaigns'
+    __table_args__ = (
+        # Dashboards and campaign lists: newest campaigns of a podcast / brand
+        # (walked backwards for ORDER BY created_at DESC)
+        db.Index('ix_campaigns_podcast_id_created_at', 'podcast_id', 'created_at'),
+        db.Index('ix_campaigns_brand_id_created_at', 'brand_id', 'created_at'),
+        # Per-status counts of flask recount (covering)
+        db.Index('ix_campaigns_podcast_id_status', 'podcast_id', 'status'),
+        db.Index('ix_campaigns_brand_id_status', 'brand_id', 'status'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     brand_id = db.Column(db.Integer, db.ForeignKey('brands.id'), nullable=False)
@@ -4,6 +4,9 @@ from app import db
 class Deal(db.Model):
     """Deal model for negotiation history"""
     __tablename__ = 'deals'
+    __table_args__ = (
+        db.Index('ix_deals_campaign_id_created_at', 'campaign_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     campaign_id = db.Column(db.Integer, db.ForeignKey('campaigns.id'), nullable=False)
@@ -1,9 +1,25 @@
 from datetime import datetime
+from sqlalchemy.orm import validates
 from app import db
+from app.models.campaign import CampaignCountersMixin
+from app.models.types import JSONType
+from app.utils.demographics import audience_profile
 
-class Podcast(db.Model):
+class Podcast(CampaignCountersMixin, db.Model):
     """Podcast model"""
     __tablename__ = 'podcasts'
+    __table_args__ = (
+        db.Index('ix_podcasts_user_id_created_at', 'user_id', 'created_at'),
+        # Marketplace / listing keyset order, optionally narrowed by category
+        db.Index('ix_podcasts_is_active_average_listeners', 'is_active', 'average_listeners', 'id'),
+        db.Index('ix_podcasts_category_average_listeners', 'category', 'average_listeners', 'id'),
+        # Marketplace audience filters (country, age band), same keyset order
+        db.Index('ix_podcasts_country_age_average_listeners', 'primary_country', 'primary_age_band', 'average_listeners', 'id'),
+        db.Index('ix_podcasts_age_average_listeners', 'primary_age_band', 'average_listeners', 'id'),
+        db.Index('ix_podcasts_female_share', 'female_share'),
+        # Recommendation matrix sync (rows updated since its watermark)
+        db.Index('ix_podcasts_updated_at', 'updated_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -21,14 +37,22 @@ class Podcast(db.Model):
     average_listeners = db.Column(db.Integer, default=0)
     total_episodes = db.Column(db.Integer, default=0)
     
-    # Demographics (JSON stored as string)
-    audience_demographics = db.Column(db.Text)  # Age, gender, location
+    # Demographics: {"age": {"25-34": 0.6, ...}, "gender": {...}, "country": {...}}
+    audience_demographics = db.Column(JSONType)
+    
+    # Extracted from audience_demographics on assignment, for indexed filters
+    primary_age_band = db.Column(db.String(10))
+    female_share = db.Column(db.Float)
+    primary_country = db.Column(db.String(10))
     
     # Advertising info
     is_accepting_ads = db.Column(db.Boolean, default=True)
     min_rate = db.Column(db.Float)  # Minimum rate per episode
     max_rate = db.Column(db.Float)  # Maximum rate per episode
     
+    # Lifetime delivered revenue (negotiated rate x episodes completed)
+    total_revenue = db.Column(db.Float, nullable=False, default=0)
+    
     # Links
     rss_feed = db.Column(db.String(500))
     apple_podcasts_url = db.Column(db.String(500))
@@ -46,6 +70,12 @@ class Podcast(db.Model):
     # Relationships
     campaigns = db.relationship('Campaign', backref='podcast', lazy='dynamic')
     
+    @validates('audience_demographics')
+    def _extract_audience_profile(self, key, value):
+        for column, extracted in audience_profile(value).items():
+            setattr(self, column, extracted)
+        return value
+    
     def to_dict(self):
         """Convert to dictionary"""
         return {
@@ -58,6 +88,7 @@ class Podcast(db.Model):
             'language': self.language,
             'average_listeners': self.average_listeners,
             'total_episodes': self.total_episodes,
+            'audience_demographics': self.audience_demographics,
             'is_accepting_ads': self.is_accepting_ads,
             'min_rate': self.min_rate,
             'max_rate': self.max_rate,
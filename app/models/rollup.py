@@ -0,0 +1,65 @@
+from app import db
+
+class DailyMetricsMixin:
+    """Metric columns shared by the daily AdPerformance rollups"""
+
+    day = db.Column(db.Date, nullable=False)
+
+    # Same names as AdPerformance so aggregates work on either source
+    impressions = db.Column(db.Integer, nullable=False, default=0)
+    unique_listeners = db.Column(db.Integer, nullable=False, default=0)
+    click_throughs = db.Column(db.Integer, nullable=False, default=0)
+    promo_code_uses = db.Column(db.Integer, nullable=False, default=0)
+    conversions = db.Column(db.Integer, nullable=False, default=0)
+    revenue_generated = db.Column(db.Float, nullable=False, default=0)
+
+    # Number of AdPerformance records folded into the row
+    records = db.Column(db.Integer, nullable=False, default=0)
+
+    METRICS = (
+        'impressions', 'unique_listeners', 'click_throughs',
+        'promo_code_uses', 'conversions', 'revenue_generated'
+    )
+
+    def to_dict(self):
+        """Convert to dictionary"""
+        data = {'day': self.day.isoformat() if self.day else None}
+        data.update({metric: getattr(self, metric) for metric in self.METRICS})
+        data['records'] = self.records
+        return data
+
+class CampaignDailyStats(DailyMetricsMixin, db.Model):
+    """AdPerformance totals per campaign and day"""
+    __tablename__ = 'campaign_daily_stats'
+    __table_args__ = (
+        db.PrimaryKeyConstraint('campaign_id', 'day'),
+    )
+
+    campaign_id = db.Column(db.Integer, db.ForeignKey('campaigns.id'), nullable=False)
+
+    def __repr__(self):
+        return f'<CampaignDailyStats Campaign {self.campaign_id} {self.day}>'
+
+class PodcastDailyStats(DailyMetricsMixin, db.Model):
+    """AdPerformance totals per podcast and day, across all its campaigns"""
+    __tablename__ = 'podcast_daily_stats'
+    __table_args__ = (
+        db.PrimaryKeyConstraint('podcast_id', 'day'),
+    )
+
+    podcast_id = db.Column(db.Integer, db.ForeignKey('podcasts.id'), nullable=False)
+
+    def __repr__(self):
+        return f'<PodcastDailyStats Podcast {self.podcast_id} {self.day}>'
+
+class BrandDailyStats(DailyMetricsMixin, db.Model):
+    """AdPerformance totals per brand and day, across all its campaigns"""
+    __tablename__ = 'brand_daily_stats'
+    __table_args__ = (
+        db.PrimaryKeyConstraint('brand_id', 'day'),
+    )
+
+    brand_id = db.Column(db.Integer, db.ForeignKey('brands.id'), nullable=False)
+
+    def __repr__(self):
+        return f'<BrandDailyStats Brand {self.brand_id} {self.day}>'
@@ -0,0 +1,80 @@
+from datetime import datetime
+from sqlalchemy import event
+from app import db
+
+class SpendEntry(db.Model):
+    """Append-only ledger of what brands owe for delivered episodes
+
+    One entry per delivery, renegotiation or reconciliation adjustment; the
+    amounts of a campaign's entries always add up to its negotiated rate x
+    episodes completed. ``balance`` is the brand's total_spent right after
+    the entry was written.
+    """
+    __tablename__ = 'spend_ledger'
+    __table_args__ = (
+        db.Index('ix_spend_ledger_brand_id_created_at', 'brand_id', 'created_at'),
+        db.Index('ix_spend_ledger_campaign_id', 'campaign_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    brand_id = db.Column(db.Integer, db.ForeignKey('brands.id'), nullable=False)
+    campaign_id = db.Column(db.Integer, db.ForeignKey('campaigns.id'), nullable=False)
+
+    # 'delivery', 'renegotiation', 'adjustment'
+    kind = db.Column(db.String(20), nullable=False)
+    amount = db.Column(db.Float, nullable=False)
+    episodes = db.Column(db.Integer, nullable=False, default=0)  # Episodes delivered by the entry
+    rate = db.Column(db.Float)  # Negotiated rate the entry was priced at
+    balance = db.Column(db.Float, nullable=False)
+
+    # First day of the entry's month, the BrandMonthlySpend key
+    month = db.Column(db.Date, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        """Convert to dictionary"""
+        return {
+            'id': self.id,
+            'brand_id': self.brand_id,
+            'campaign_id': self.campaign_id,
+            'kind': self.kind,
+            'amount': self.amount,
+            'episodes': self.episodes,
+            'rate': self.rate,
+            'balance': self.balance,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+    def __repr__(self):
+        return f'<SpendEntry Brand {self.brand_id} {self.kind} {self.amount}>'
+
+@event.listens_for(SpendEntry, 'before_update')
+@event.listens_for(SpendEntry, 'before_delete')
+def _append_only(mapper, connection, target):
+    raise ValueError('Spend ledger entries are append-only; record an adjustment instead')
+
+class BrandMonthlySpend(db.Model):
+    """Spend ledger totals per brand and month"""
+    __tablename__ = 'brand_monthly_spend'
+    __table_args__ = (
+        db.PrimaryKeyConstraint('brand_id', 'month'),
+    )
+
+    brand_id = db.Column(db.Integer, db.ForeignKey('brands.id'), nullable=False)
+    month = db.Column(db.Date, nullable=False)
+    spent = db.Column(db.Float, nullable=False, default=0)
+    entries = db.Column(db.Integer, nullable=False, default=0)
+    # The brand's total_spent at the last entry of the month
+    balance = db.Column(db.Float, nullable=False, default=0)
+
+    def to_dict(self):
+        """Convert to dictionary"""
+        return {
+            'month': self.month.strftime('%Y-%m') if self.month else None,
+            'spent': self.spent,
+            'entries': self.entries,
+            'balance': self.balance
+        }
+
+    def __repr__(self):
+        return f'<BrandMonthlySpend Brand {self.brand_id} {self.month}>'
@@ -4,6 +4,9 @@ from app import db
 class AdPerformance(db.Model):
     """Ad performance tracking model"""
     __tablename__ = 'ad_performance'
+    __table_args__ = (
+        db.Index('ix_ad_performance_campaign_id_tracked_date', 'campaign_id', 'tracked_date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     campaign_id = db.Column(db.Integer, db.ForeignKey('campaigns.id'), nullable=False)
@@ -0,0 +1,5 @@
+from sqlalchemy.dialects.postgresql import JSONB
+from app import db
+
+# JSON on every backend, stored as binary JSONB on PostgreSQL
+JSONType = db.JSON().with_variant(JSONB(), 'postgresql')
@@ -1,7 +1,15 @@
 from datetime import datetime
+from flask import current_app
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from app import db, login_manager
+from app.utils.cache import SimpleBackend
+
+# Columns of the cached identity; anything else is read from the full row
+IDENTITY_FIELDS = ('id', 'email', 'username', 'user_type', 'full_name', 'is_active')
+
+# Per-process cache of identities, keyed by user id
+_identities = SimpleBackend(threshold=10000)
 
 class User(UserMixin, db.Model):
     """User model for authentication"""
@@ -65,7 +73,77 @@ class User(UserMixin, db.Model):
     def __repr__(self):
         return f'<User {self.username}>'
 
+class SessionUser(UserMixin):
+    """The logged-in user as seen by Flask-Login
+
+    ``id`` comes from Flask-Login's session cookie; ``user_type`` and the other
+    identity fields from a slim projection cached per process
+    (USER_CACHE_TIMEOUT), so views that only use them never touch the
+    database. Any other attribute (bio, relationships, to_dict...) falls back
+    to the full User row, loaded at most once per request. Views that modify
+    the user must load the User itself.
+    """
+
+    def __init__(self, user_id, identity=None):
+        self.id = user_id
+        if identity is not None:
+            self._identity = identity
+
+    @property
+    def user_type(self):
+        return self.identity['user_type']
+
+    @property
+    def is_active(self):
+        # A user deleted since the session was opened is logged out
+        return self.identity is not None and self.identity['is_active']
+
+    @property
+    def identity(self):
+        if '_identity' not in self.__dict__:
+            self._identity = load_identity(self.id)
+        return self._identity
+
+    @property
+    def record(self):
+        """The full User row"""
+        if '_record' not in self.__dict__:
+            self._record = db.session.get(User, self.id)
+        return self._record
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if name in IDENTITY_FIELDS:
+            return self.identity[name]
+        return getattr(self.record, name)
+
+    def __repr__(self):
+        return f'<SessionUser {self.id}>'
+
+def load_identity(user_id):
+    """The identity columns of a user, from the per-process cache or one slim query"""
+    identity = _identities.get(user_id)
+    if identity is None:
+        row = db.session.execute(
+            db.select(*[getattr(User, field) for field in IDENTITY_FIELDS]).where(User.id == user_id)
+        ).first()
+        if row is None:
+            return None
+        identity = row._asdict()
+        _identities.set(user_id, identity, current_app.config['USER_CACHE_TIMEOUT'])
+    return identity
+
+def forget_user(user_id):
+    """Drop a user's cached identity after it changed"""
+    _identities.delete(user_id)
+
 @login_manager.user_loader
 def load_user(user_id):
     """Load user by ID for Flask-Login"""
-    return User.query.get(int(user_id))
+    user_id = int(user_id)
+    # Cached per process, so checking that the user still exists is free
+    identity = load_identity(user_id)
+    if identity is None:
+        return None
+    return SessionUser(user_id, identity)
@@ -1,43 +1,44 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify, current_app
 from flask_login import login_required, current_user
 from app import db
-from app.models import AdPerformance, Campaign, Podcast, Brand
-from sqlalchemy import func, desc
+from app.models import AdPerformance, Campaign, Podcast, Brand, CampaignDailyStats, PodcastDailyStats, BrandDailyStats, BrandMonthlySpend, SpendEntry
+from app.utils.analytics import performance_totals, invalidate_user_stats
+from app.utils.counters import update_campaign_counters
+from app.utils.ledger import month_of
+from app.utils.rollups import record_performance
+from app.utils.access import load_campaign, campaign_role, is_podcast_owner
+from app.utils.ingest import RowError, validate_row, iter_payload, chunked, complete_episodes
+from app.utils.export import EXPORT_FORMATS, export_performance
+from app.utils.timeseries import parse_range, time_series
+from app.utils.pagination import keyset_paginate
+from sqlalchemy import select, func, desc, insert
+from sqlalchemy.orm import contains_eager, joinedload
 from datetime import datetime, timedelta
 
 analytics_bp = Blueprint('analytics', __name__, url_prefix='/analytics')
 
+def _includes(name):
+    """Whether the caller asked for a per-record list, e.g. ?include=records"""
+    return name in request.args.get('include', '').split(',')
+
 @analytics_bp.route('/campaign/<int:campaign_id>')
 @login_required
 def campaign_analytics(campaign_id):
     """View analytics for a specific campaign"""
-    campaign = Campaign.query.get_or_404(campaign_id)
+    campaign = load_campaign(campaign_id)
     
     # Check permission
-    can_view = False
-    if current_user.user_type == 'podcast_host' and campaign.podcast.user_id == current_user.id:
-        can_view = True
-    elif current_user.user_type == 'brand' and campaign.brand.user_id == current_user.id:
-        can_view = True
-    
-    if not can_view:
+    if campaign_role(campaign) is None:
         if request.is_json:
             return jsonify({'error': 'Permission denied'}), 403
         flash('Vous n\'avez pas la permission de voir ces analytics.', 'danger')
         return redirect(url_for('main.dashboard'))
     
-    # Get all performance records for this campaign
-    performance_records = AdPerformance.query.filter_by(
-        campaign_id=campaign_id
-    ).order_by(AdPerformance.tracked_date).all()
-    
-    # Calculate totals
-    total_impressions = sum(p.impressions for p in performance_records)
-    total_unique_listeners = sum(p.unique_listeners for p in performance_records)
-    total_clicks = sum(p.click_throughs for p in performance_records)
-    total_promo_uses = sum(p.promo_code_uses for p in performance_records)
-    total_conversions = sum(p.conversions for p in performance_records)
-    total_revenue = sum(p.revenue_generated for p in performance_records)
+    totals = performance_totals(CampaignDailyStats, CampaignDailyStats.campaign_id == campaign_id)
+    total_impressions = totals['impressions']
+    total_clicks = totals['clicks']
+    total_conversions = totals['conversions']
+    total_revenue = totals['revenue']
     
     # Calculate averages
     avg_ctr = (total_clicks / total_impressions * 100) if total_impressions > 0 else 0
@@ -49,15 +50,7 @@ def campaign_analytics(campaign_id):
     
     analytics_data = {
         'campaign': campaign.to_dict(),
-        'performance_records': [p.to_dict() for p in performance_records],
-        'totals': {
-            'impressions': total_impressions,
-            'unique_listeners': total_unique_listeners,
-            'clicks': total_clicks,
-            'promo_uses': total_promo_uses,
-            'conversions': total_conversions,
-            'revenue': total_revenue
-        },
+        'totals': totals,
         'metrics': {
             'ctr': round(avg_ctr, 2),
             'conversion_rate': round(avg_conversion_rate, 2),
@@ -66,6 +59,16 @@ def campaign_analytics(campaign_id):
         }
     }
     
+    # Per-episode records only on request, newest first
+    if _includes('records'):
+        page = keyset_paginate(
+            AdPerformance.query.filter_by(campaign_id=campaign_id),
+            [AdPerformance.tracked_date, AdPerformance.id],
+            cursor=request.args.get('cursor')
+        )
+        analytics_data['performance_records'] = [p.to_dict() for p in page.items]
+        analytics_data['pagination'] = page.to_dict()
+    
     if request.is_json:
         return jsonify(analytics_data), 200
     
@@ -84,37 +87,29 @@ def podcast_analytics(podcast_id):
         flash('Vous n\'avez pas la permission de voir ces analytics.', 'danger')
         return redirect(url_for('main.dashboard'))
     
-    # Get all campaigns for this podcast
-    campaigns = Campaign.query.filter_by(podcast_id=podcast_id).all()
-    campaign_ids = [c.id for c in campaigns]
-    
-    # Get performance data
-    performance_records = AdPerformance.query.filter(
-        AdPerformance.campaign_id.in_(campaign_ids)
-    ).all()
-    
-    # Calculate totals
-    total_campaigns = len(campaigns)
-    active_campaigns = len([c for c in campaigns if c.status == 'active'])
-    completed_campaigns = len([c for c in campaigns if c.status == 'completed'])
-    total_revenue = sum(c.negotiated_rate * c.episodes_completed for c in campaigns if c.negotiated_rate)
-    
-    total_impressions = sum(p.impressions for p in performance_records)
-    total_conversions = sum(p.conversions for p in performance_records)
+    performance = performance_totals(PodcastDailyStats, PodcastDailyStats.podcast_id == podcast_id)
     
     analytics_data = {
         'podcast': podcast.to_dict(),
-        'campaigns': [c.to_dict() for c in campaigns],
         'totals': {
-            'total_campaigns': total_campaigns,
-            'active_campaigns': active_campaigns,
-            'completed_campaigns': completed_campaigns,
-            'total_revenue': total_revenue,
-            'total_impressions': total_impressions,
-            'total_conversions': total_conversions
+            'total_campaigns': podcast.total_campaigns,
+            'active_campaigns': podcast.active_campaigns,
+            'completed_campaigns': podcast.completed_campaigns,
+            'total_revenue': podcast.total_revenue,
+            'total_impressions': performance['impressions'],
+            'total_conversions': performance['conversions']
         }
     }
     
+    if _includes('campaigns'):
+        page = keyset_paginate(
+            Campaign.query.filter_by(podcast_id=podcast_id),
+            [Campaign.created_at, Campaign.id],
+            cursor=request.args.get('cursor')
+        )
+        analytics_data['campaigns'] = [c.to_dict() for c in page.items]
+        analytics_data['pagination'] = page.to_dict()
+    
     if request.is_json:
         return jsonify(analytics_data), 200
     
@@ -133,37 +128,33 @@ def brand_analytics(brand_id):
         flash('Vous n\'avez pas la permission de voir ces analytics.', 'danger')
         return redirect(url_for('main.dashboard'))
     
-    # Get all campaigns for this brand
-    campaigns = Campaign.query.filter_by(brand_id=brand_id).all()
-    campaign_ids = [c.id for c in campaigns]
-    
-    # Get performance data
-    performance_records = AdPerformance.query.filter(
-        AdPerformance.campaign_id.in_(campaign_ids)
-    ).all()
+    performance = performance_totals(BrandDailyStats, BrandDailyStats.brand_id == brand_id)
     
-    # Calculate totals
-    total_campaigns = len(campaigns)
-    active_campaigns = len([c for c in campaigns if c.status == 'active'])
-    completed_campaigns = len([c for c in campaigns if c.status == 'completed'])
-    total_spent = sum(c.negotiated_rate * c.episodes_completed for c in campaigns if c.negotiated_rate)
-    
-    total_impressions = sum(p.impressions for p in performance_records)
-    total_conversions = sum(p.conversions for p in performance_records)
-    total_revenue = sum(p.revenue_generated for p in performance_records)
+    total_campaigns = brand.total_campaigns
+    total_spent = brand.total_spent or 0
+    total_conversions = performance['conversions']
+    total_revenue = performance['revenue']
     
     # Calculate ROI
     roi = ((total_revenue - total_spent) / total_spent * 100) if total_spent > 0 else 0
     
+    # This month against the budget: one snapshot row and a month of rollups
+    month = month_of(datetime.utcnow())
+    snapshot = db.session.get(BrandMonthlySpend, (brand_id, month))
+    month_spent = snapshot.spent if snapshot else 0
+    month_revenue = performance_totals(
+        BrandDailyStats, BrandDailyStats.brand_id == brand_id, BrandDailyStats.day >= month
+    )['revenue']
+    budget = brand.monthly_budget
+    
     analytics_data = {
         'brand': brand.to_dict(),
-        'campaigns': [c.to_dict() for c in campaigns],
         'totals': {
             'total_campaigns': total_campaigns,
-            'active_campaigns': active_campaigns,
-            'completed_campaigns': completed_campaigns,
+            'active_campaigns': brand.active_campaigns,
+            'completed_campaigns': brand.completed_campaigns,
             'total_spent': total_spent,
-            'total_impressions': total_impressions,
+            'total_impressions': performance['impressions'],
             'total_conversions': total_conversions,
             'total_revenue': total_revenue
         },
@@ -171,9 +162,33 @@ def brand_analytics(brand_id):
             'roi': round(roi, 2),
             'cost_per_conversion': round(total_spent / total_conversions, 2) if total_conversions > 0 else 0,
             'average_campaign_cost': round(total_spent / total_campaigns, 2) if total_campaigns > 0 else 0
+        },
+        'budget': {
+            'month': month.strftime('%Y-%m'),
+            'monthly_budget': budget,
+            'spent': round(month_spent, 2),
+            'remaining': round(budget - month_spent, 2) if budget else None,
+            'utilization': round(month_spent / budget * 100, 2) if budget else None,
+            'roi': round((month_revenue - month_spent) / month_spent * 100, 2) if month_spent > 0 else 0
         }
     }
     
+    # Monthly spend snapshots, newest first
+    if _includes('spend'):
+        analytics_data['monthly_spend'] = [
+            s.to_dict() for s in BrandMonthlySpend.query.filter_by(brand_id=brand_id)
+            .order_by(desc(BrandMonthlySpend.month)).limit(12)
+        ]
+    
+    if _includes('campaigns'):
+        page = keyset_paginate(
+            Campaign.query.filter_by(brand_id=brand_id),
+            [Campaign.created_at, Campaign.id],
+            cursor=request.args.get('cursor')
+        )
+        analytics_data['campaigns'] = [c.to_dict() for c in page.items]
+        analytics_data['pagination'] = page.to_dict()
+    
     if request.is_json:
         return jsonify(analytics_data), 200
     
@@ -193,10 +208,10 @@ def add_performance_data():
         flash('Campaign ID requis.', 'danger')
         return redirect(request.referrer or url_for('main.dashboard'))
     
-    campaign = Campaign.query.get_or_404(campaign_id)
+    campaign = load_campaign(campaign_id)
     
     # Check permission (podcast host can add performance data)
-    if current_user.user_type != 'podcast_host' or campaign.podcast.user_id != current_user.id:
+    if not is_podcast_owner(campaign):
         if request.is_json:
             return jsonify({'error': 'Permission denied'}), 403
         flash('Seuls les podcasters peuvent ajouter des données de performance.', 'danger')
@@ -217,15 +232,15 @@ def add_performance_data():
     )
     
     db.session.add(performance)
+    db.session.flush()
+    record_performance(campaign, [performance])
     
     # Update campaign progress
-    campaign.episodes_completed += 1
-    
-    if campaign.episodes_completed >= campaign.total_episodes:
-        campaign.status = 'completed'
-        campaign.completed_at = datetime.utcnow()
+    complete_episodes(campaign)
+    update_campaign_counters(campaign, delivered_on=[performance.tracked_date])
     
     db.session.commit()
+    invalidate_user_stats(campaign)
     
     if request.is_json:
         return jsonify({
@@ -235,3 +250,190 @@ def add_performance_data():
     
     flash('Données de performance ajoutées avec succès.', 'success')
     return redirect(url_for('analytics.campaign_analytics', campaign_id=campaign_id))
+
+@analytics_bp.route('/performance/bulk', methods=['POST'])
+@login_required
+def add_performance_bulk():
+    """Add performance tracking data in bulk (JSON array or NDJSON)"""
+    if current_user.user_type != 'podcast_host':
+        return jsonify({'error': 'Permission denied'}), 403
+    
+    try:
+        rows = iter_payload(request)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    chunk_size = current_app.config.get('BULK_INSERT_CHUNK_SIZE', 1000)
+    inserted = 0
+    errors = []
+    campaigns = {}
+    
+    for chunk_index, chunk in enumerate(chunked(rows, chunk_size)):
+        offset = chunk_index * chunk_size
+        valid = []
+        for index, data in enumerate(chunk, start=offset):
+            try:
+                if isinstance(data, RowError):
+                    raise data
+                valid.append((index, validate_row(data)))
+            except RowError as e:
+                errors.append({'row': index, 'error': str(e)})
+        
+        # Resolve the campaigns of this chunk the user may report on, in one query
+        wanted = {row['campaign_id'] for _, row in valid} - set(campaigns)
+        if wanted:
+            for campaign in Campaign.query.join(Podcast).filter(
+                Campaign.id.in_(wanted),
+                Podcast.user_id == current_user.id
+            ).options(
+                contains_eager(Campaign.podcast),
+                joinedload(Campaign.brand)
+            ):
+                campaigns[campaign.id] = campaign
+        
+        by_campaign = {}
+        for index, row in valid:
+            if row['campaign_id'] not in campaigns:
+                errors.append({'row': index, 'error': 'Campaign not found or permission denied'})
+                continue
+            by_campaign.setdefault(row['campaign_id'], []).append(row)
+        
+        if not by_campaign:
+            continue
+        
+        # One executemany per chunk, then a single progress update per campaign
+        records = [row for campaign_rows in by_campaign.values() for row in campaign_rows]
+        db.session.execute(insert(AdPerformance), records)
+        for campaign_id, campaign_rows in by_campaign.items():
+            campaign = campaigns[campaign_id]
+            record_performance(campaign, campaign_rows)
+            complete_episodes(campaign, len(campaign_rows))
+            update_campaign_counters(campaign, delivered_on=[row['tracked_date'] for row in campaign_rows])
+        db.session.commit()
+        invalidate_user_stats(*[campaigns[campaign_id] for campaign_id in by_campaign])
+        inserted += len(records)
+    
+    errors.sort(key=lambda e: e['row'])
+    
+    return jsonify({
+        'message': f'{inserted} performance records added',
+        'inserted': inserted,
+        'failed': len(errors),
+        'errors': errors,
+        'campaigns': [
+            {
+                'id': c.id,
+                'episodes_completed': c.episodes_completed,
+                'status': c.status
+            }
+            for c in campaigns.values()
+        ]
+    }), 201 if inserted else 400
+
+def _time_series_response(scope, scope_id, rollup, rollup_criteria, spend_criteria):
+    try:
+        bucket, start, end, max_points = parse_range(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    data = time_series(rollup, rollup_criteria, spend_criteria, bucket, start, end, max_points)
+    return jsonify(dict(data, scope=scope, id=scope_id)), 200
+
+@analytics_bp.route('/campaign/<int:campaign_id>/timeseries')
+@login_required
+def campaign_time_series(campaign_id):
+    """Bucketed performance, spend, CTR and ROI series of a campaign, for charts"""
+    campaign = load_campaign(campaign_id)
+    
+    if campaign_role(campaign) is None:
+        return jsonify({'error': 'Permission denied'}), 403
+    
+    return _time_series_response(
+        'campaign', campaign_id, CampaignDailyStats,
+        [CampaignDailyStats.campaign_id == campaign_id],
+        [SpendEntry.campaign_id == campaign_id]
+    )
+
+@analytics_bp.route('/podcast/<int:podcast_id>/timeseries')
+@login_required
+def podcast_time_series(podcast_id):
+    """Bucketed performance, spend, CTR and ROI series of all a podcast's campaigns"""
+    podcast = Podcast.query.get_or_404(podcast_id)
+    
+    if podcast.user_id != current_user.id:
+        return jsonify({'error': 'Permission denied'}), 403
+    
+    return _time_series_response(
+        'podcast', podcast_id, PodcastDailyStats,
+        [PodcastDailyStats.podcast_id == podcast_id],
+        [SpendEntry.campaign_id.in_(select(Campaign.id).where(Campaign.podcast_id == podcast_id))]
+    )
+
+@analytics_bp.route('/brand/<int:brand_id>/timeseries')
+@login_required
+def brand_time_series(brand_id):
+    """Bucketed performance, spend, CTR and ROI series of all a brand's campaigns"""
+    brand = Brand.query.get_or_404(brand_id)
+    
+    if brand.user_id != current_user.id:
+        return jsonify({'error': 'Permission denied'}), 403
+    
+    return _time_series_response(
+        'brand', brand_id, BrandDailyStats,
+        [BrandDailyStats.brand_id == brand_id],
+        [SpendEntry.brand_id == brand_id]
+    )
+
+@analytics_bp.route('/campaign/<int:campaign_id>/export.<fmt>')
+@login_required
+def export_campaign(campaign_id, fmt):
+    """Stream a campaign's performance records as CSV or NDJSON"""
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': 'Unsupported export format'}), 404
+    
+    campaign = load_campaign(campaign_id)
+    
+    if campaign_role(campaign) is None:
+        return jsonify({'error': 'Permission denied'}), 403
+    
+    return export_performance(
+        fmt,
+        f'campaign-{campaign_id}-performance',
+        AdPerformance.campaign_id == campaign_id
+    )
+
+@analytics_bp.route('/podcast/<int:podcast_id>/export.<fmt>')
+@login_required
+def export_podcast(podcast_id, fmt):
+    """Stream the performance records of all a podcast's campaigns as CSV or NDJSON"""
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': 'Unsupported export format'}), 404
+    
+    podcast = Podcast.query.get_or_404(podcast_id)
+    
+    if podcast.user_id != current_user.id:
+        return jsonify({'error': 'Permission denied'}), 403
+    
+    return export_performance(
+        fmt,
+        f'podcast-{podcast_id}-performance',
+        AdPerformance.campaign_id.in_(select(Campaign.id).where(Campaign.podcast_id == podcast_id))
+    )
+
+@analytics_bp.route('/brand/<int:brand_id>/export.<fmt>')
+@login_required
+def export_brand(brand_id, fmt):
+    """Stream the performance records of all a brand's campaigns as CSV or NDJSON"""
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': 'Unsupported export format'}), 404
+    
+    brand = Brand.query.get_or_404(brand_id)
+    
+    if brand.user_id != current_user.id:
+        return jsonify({'error': 'Permission denied'}), 403
+    
+    return export_performance(
+        fmt,
+        f'brand-{brand_id}-performance',
+        AdPerformance.campaign_id.in_(select(Campaign.id).where(Campaign.brand_id == brand_id))
+    )
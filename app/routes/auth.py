@@ -1,7 +1,7 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
 from flask_login import login_user, logout_user, login_required, current_user
 from app import db
-from app.models.user import User
+from app.models.user import User, forget_user
 from datetime import datetime
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/auth')
@@ -105,6 +105,7 @@ def login():
         db.session.commit()
         
         login_user(user, remember=remember)
+        forget_user(user.id)
         
         if request.is_json:
             return jsonify({'message': 'Login successful', 'user': user.to_dict()}), 200
@@ -138,16 +139,19 @@ def update_profile():
     """Update user profile"""
     data = request.form if request.form else request.get_json()
     
-    current_user.full_name = data.get('full_name', current_user.full_name)
-    current_user.company_name = data.get('company_name', current_user.company_name)
-    current_user.bio = data.get('bio', current_user.bio)
-    current_user.website = data.get('website', current_user.website)
-    current_user.phone = data.get('phone', current_user.phone)
+    # current_user is a read-only session identity, edit the row itself
+    user = db.session.get(User, current_user.id)
+    user.full_name = data.get('full_name', user.full_name)
+    user.company_name = data.get('company_name', user.company_name)
+    user.bio = data.get('bio', user.bio)
+    user.website = data.get('website', user.website)
+    user.phone = data.get('phone', user.phone)
     
     db.session.commit()
+    forget_user(user.id)
     
     if request.is_json:
-        return jsonify({'message': 'Profile updated', 'user': current_user.to_dict()}), 200
+        return jsonify({'message': 'Profile updated', 'user': user.to_dict()}), 200
     
     flash('Profil mis à jour avec succès.', 'success')
     return redirect(url_for('auth.profile'))
@@ -1,15 +1,31 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
 from flask_login import login_required, current_user
 from app import db
-from app.models import Brand
+from app.models import Brand, Podcast
+from app.utils.analytics import invalidate_user_stats
+from app.utils.cache import response_cache
+from app.utils.demographics import category_list, load_json
+from app.utils.matching import podcast_matcher
+from app.utils.search import search_index
 from sqlalchemy import desc
 
 brands_bp = Blueprint('brands', __name__, url_prefix='/brands')
 
 @brands_bp.route('/')
+@response_cache.cached('brands')
 def list_brands():
     """List all brands"""
-    brands = Brand.query.filter_by(is_active=True).order_by(desc(Brand.created_at)).all()
+    search = request.args.get('search')
+    
+    query = Brand.query.filter_by(is_active=True)
+    
+    hits = search_index.brand_hits(search) if search else None
+    if hits is not None:
+        query = query.join(hits, hits.c.id == Brand.id).order_by(desc(hits.c.score), desc(Brand.id))
+    else:
+        query = query.order_by(desc(Brand.created_at))
+    
+    brands = query.all()
     
     if request.is_json:
         return jsonify({'brands': [b.to_dict() for b in brands]}), 200
@@ -17,6 +33,7 @@ def list_brands():
     return render_template('brands/list.html', brands=brands)
 
 @brands_bp.route('/<int:brand_id>')
+@response_cache.cached('brand:{brand_id}')
 def view_brand(brand_id):
     """View brand details"""
     brand = Brand.query.get_or_404(brand_id)
@@ -56,11 +73,17 @@ def create_brand():
             contact_email=data.get('contact_email', current_user.email),
             contact_phone=data.get('contact_phone'),
             monthly_budget=float(data.get('monthly_budget', 0)) if data.get('monthly_budget') else None,
+            target_demographics=load_json(data.get('target_demographics')),
+            preferred_categories=category_list(data.get('preferred_categories')),
             website_url=data.get('website_url')
         )
         
         db.session.add(brand)
+        db.session.flush()
+        search_index.index_brand(brand)
         db.session.commit()
+        response_cache.invalidate('brands')
+        invalidate_user_stats(user_ids=[current_user.id])
         
         if request.is_json:
             return jsonify({
@@ -97,8 +120,15 @@ def edit_brand(brand_id):
         
         if data.get('monthly_budget'):
             brand.monthly_budget = float(data.get('monthly_budget'))
+        if 'target_demographics' in data:
+            brand.target_demographics = load_json(data.get('target_demographics'))
+        if 'preferred_categories' in data:
+            brand.preferred_categories = category_list(data.get('preferred_categories'))
         
+        search_index.index_brand(brand)
         db.session.commit()
+        response_cache.invalidate('brands', f'brand:{brand.id}')
+        invalidate_user_stats(user_ids=[current_user.id])
         
         if request.is_json:
             return jsonify({
@@ -123,8 +153,11 @@ def delete_brand(brand_id):
         flash('Vous n\'avez pas la permission de supprimer cette marque.', 'danger')
         return redirect(url_for('main.dashboard'))
     
+    search_index.remove_brand(brand.id)
     db.session.delete(brand)
     db.session.commit()
+    response_cache.invalidate('brands', f'brand:{brand_id}')
+    invalidate_user_stats(user_ids=[current_user.id])
     
     if request.is_json:
         return jsonify({'message': 'Brand deleted successfully'}), 200
@@ -146,3 +179,42 @@ def my_brands():
         return jsonify({'brands': [b.to_dict() for b in brands]}), 200
     
     return render_template('brands/my_brands.html', brands=brands)
+
+@brands_bp.route('/<int:brand_id>/recommendations')
+@login_required
+def recommendations(brand_id):
+    """Podcasts ranked for a brand by category, demographics, audience and rate fit"""
+    brand = Brand.query.get_or_404(brand_id)
+    
+    if brand.user_id != current_user.id:
+        if request.is_json:
+            return jsonify({'error': 'Permission denied'}), 403
+        flash('Vous n\'avez pas la permission de voir ces recommandations.', 'danger')
+        return redirect(url_for('main.dashboard'))
+    
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+    
+    # Scores only change with the podcasts or the brand's own preferences
+    ranked = response_cache.memoize(
+        f'recommendations:{brand.id}:{limit}',
+        lambda: podcast_matcher.recommend(brand, limit),
+        'podcasts', f'brand:{brand.id}'
+    )
+    # A cached ranking may predate a podcast being deactivated or closed to ads
+    podcasts = {p.id: p for p in Podcast.query.filter(
+        Podcast.id.in_([podcast_id for podcast_id, _, _ in ranked])
+    ).filter_by(is_active=True, is_accepting_ads=True)}
+    matches = [
+        {'podcast': podcasts[podcast_id], 'score': score, 'components': components}
+        for podcast_id, score, components in ranked if podcast_id in podcasts
+    ]
+    
+    if request.is_json:
+        return jsonify({
+            'brand_id': brand.id,
+            'recommendations': [
+                dict(match, podcast=match['podcast'].to_dict()) for match in matches
+            ]
+        }), 200
+    
+    return render_template('brands/recommendations.html', brand=brand, matches=matches)
@@ -2,8 +2,12 @@ from flask import Blueprint, render_template, redirect, url_for, flash, request,
 from flask_login import login_required, current_user
 from app import db
 from app.models import Campaign, Brand, Podcast
+from app.utils.access import load_campaign, campaign_role, is_podcast_owner, is_brand_owner
+from app.utils.analytics import invalidate_user_stats
+from app.utils.counters import update_campaign_counters
 from datetime import datetime
 from sqlalchemy import desc, or_
+from sqlalchemy.orm import joinedload
 
 campaigns_bp = Blueprint('campaigns', __name__, url_prefix='/campaigns')
 
@@ -17,6 +21,8 @@ def list_campaigns():
         podcast_ids = [p.id for p in podcasts]
         campaigns = Campaign.query.filter(
             Campaign.podcast_id.in_(podcast_ids)
+        ).options(
+            joinedload(Campaign.brand)
         ).order_by(desc(Campaign.created_at)).all()
     
     elif current_user.user_type == 'brand':
@@ -25,6 +31,8 @@ def list_campaigns():
         brand_ids = [b.id for b in brands]
         campaigns = Campaign.query.filter(
             Campaign.brand_id.in_(brand_ids)
+        ).options(
+            joinedload(Campaign.podcast)
         ).order_by(desc(Campaign.created_at)).all()
     else:
         campaigns = []
@@ -38,17 +46,12 @@ def list_campaigns():
 @login_required
 def view_campaign(campaign_id):
     """View campaign details"""
-    campaign = Campaign.query.get_or_404(campaign_id)
+    campaign = load_campaign(campaign_id)
     
     # Check permission
-    if current_user.user_type == 'podcast_host':
-        if campaign.podcast.user_id != current_user.id:
-            flash('Vous n\'avez pas la permission de voir cette campagne.', 'danger')
-            return redirect(url_for('main.dashboard'))
-    elif current_user.user_type == 'brand':
-        if campaign.brand.user_id != current_user.id:
-            flash('Vous n\'avez pas la permission de voir cette campagne.', 'danger')
-            return redirect(url_for('main.dashboard'))
+    if campaign_role(campaign) is None:
+        flash('Vous n\'avez pas la permission de voir cette campagne.', 'danger')
+        return redirect(url_for('main.dashboard'))
     
     if request.is_json:
         return jsonify({'campaign': campaign.to_dict()}), 200
@@ -113,7 +116,9 @@ def create_campaign():
         campaign.total_budget = campaign.proposed_rate * campaign.total_episodes
         
         db.session.add(campaign)
+        update_campaign_counters(campaign)
         db.session.commit()
+        invalidate_user_stats(campaign)
         
         if request.is_json:
             return jsonify({
@@ -134,11 +139,11 @@ def create_campaign():
 @login_required
 def update_status(campaign_id):
     """Update campaign status"""
-    campaign = Campaign.query.get_or_404(campaign_id)
+    campaign = load_campaign(campaign_id)
     
     # Check permission (podcast host can approve/reject)
     if current_user.user_type == 'podcast_host':
-        if campaign.podcast.user_id != current_user.id:
+        if not is_podcast_owner(campaign):
             if request.is_json:
                 return jsonify({'error': 'Permission denied'}), 403
             flash('Vous n\'avez pas la permission de modifier cette campagne.', 'danger')
@@ -159,7 +164,9 @@ def update_status(campaign_id):
             campaign.approved_at = datetime.utcnow()
             campaign.negotiated_rate = campaign.proposed_rate
         
+        update_campaign_counters(campaign)
         db.session.commit()
+        invalidate_user_stats(campaign)
         
         if request.is_json:
             return jsonify({
@@ -179,10 +186,10 @@ def update_status(campaign_id):
 @login_required
 def approve_content(campaign_id):
     """Approve campaign content"""
-    campaign = Campaign.query.get_or_404(campaign_id)
+    campaign = load_campaign(campaign_id)
     
     # Check permission (brand can approve content)
-    if current_user.user_type != 'brand' or campaign.brand.user_id != current_user.id:
+    if not is_brand_owner(campaign):
         if request.is_json:
             return jsonify({'error': 'Permission denied'}), 403
         flash('Vous n\'avez pas la permission d\'approuver ce contenu.', 'danger')
@@ -198,7 +205,9 @@ def approve_content(campaign_id):
         if approval_status == 'approved' and campaign.status == 'approved':
             campaign.status = 'active'
         
+        update_campaign_counters(campaign)
         db.session.commit()
+        invalidate_user_stats(campaign)
         
         if request.is_json:
             return jsonify({
@@ -218,11 +227,11 @@ def approve_content(campaign_id):
 @login_required
 def complete_campaign(campaign_id):
     """Mark campaign as completed"""
-    campaign = Campaign.query.get_or_404(campaign_id)
+    campaign = load_campaign(campaign_id)
     
     # Check permission (podcast host marks as completed)
     if current_user.user_type == 'podcast_host':
-        if campaign.podcast.user_id != current_user.id:
+        if not is_podcast_owner(campaign):
             if request.is_json:
                 return jsonify({'error': 'Permission denied'}), 403
             flash('Vous n\'avez pas la permission de compléter cette campagne.', 'danger')
@@ -236,7 +245,9 @@ def complete_campaign(campaign_id):
     campaign.status = 'completed'
     campaign.completed_at = datetime.utcnow()
     
+    update_campaign_counters(campaign)
     db.session.commit()
+    invalidate_user_stats(campaign)
     
     if request.is_json:
         return jsonify({
@@ -2,6 +2,9 @@ from flask import Blueprint, render_template, redirect, url_for, flash, request,
 from flask_login import login_required, current_user
 from app import db
 from app.models import Deal, Campaign
+from app.utils.access import load_campaign, load_deal, campaign_role
+from app.utils.analytics import invalidate_user_stats
+from app.utils.counters import update_campaign_counters
 from datetime import datetime
 from sqlalchemy import desc
 
@@ -11,16 +14,10 @@ deals_bp = Blueprint('deals', __name__, url_prefix='/deals')
 @login_required
 def campaign_deals(campaign_id):
     """View all deals for a campaign"""
-    campaign = Campaign.query.get_or_404(campaign_id)
+    campaign = load_campaign(campaign_id)
     
     # Check permission
-    can_view = False
-    if current_user.user_type == 'podcast_host' and campaign.podcast.user_id == current_user.id:
-        can_view = True
-    elif current_user.user_type == 'brand' and campaign.brand.user_id == current_user.id:
-        can_view = True
-    
-    if not can_view:
+    if campaign_role(campaign) is None:
         if request.is_json:
             return jsonify({'error': 'Permission denied'}), 403
         flash('Vous n\'avez pas la permission de voir ces négociations.', 'danger')
@@ -53,16 +50,10 @@ def create_deal():
         flash('Tous les champs requis doivent être remplis.', 'danger')
         return redirect(request.referrer or url_for('main.dashboard'))
     
-    campaign = Campaign.query.get_or_404(campaign_id)
+    campaign = load_campaign(campaign_id)
     
     # Check permission
-    can_negotiate = False
-    if current_user.user_type == 'podcast_host' and campaign.podcast.user_id == current_user.id:
-        can_negotiate = True
-    elif current_user.user_type == 'brand' and campaign.brand.user_id == current_user.id:
-        can_negotiate = True
-    
-    if not can_negotiate:
+    if campaign_role(campaign) is None:
         if request.is_json:
             return jsonify({'error': 'Permission denied'}), 403
         flash('Vous n\'avez pas la permission de négocier cette campagne.', 'danger')
@@ -83,7 +74,9 @@ def create_deal():
     campaign.status = 'negotiating'
     campaign.negotiated_rate = float(offered_rate)
     
+    update_campaign_counters(campaign)
     db.session.commit()
+    invalidate_user_stats(campaign)
     
     if request.is_json:
         return jsonify({
@@ -98,17 +91,11 @@ def create_deal():
 @login_required
 def respond_to_deal(deal_id):
     """Respond to a deal offer"""
-    deal = Deal.query.get_or_404(deal_id)
+    deal = load_deal(deal_id)
     campaign = deal.campaign
     
     # Check permission (must be the other party)
-    can_respond = False
-    if current_user.user_type == 'podcast_host' and campaign.podcast.user_id == current_user.id and deal.from_user_id != current_user.id:
-        can_respond = True
-    elif current_user.user_type == 'brand' and campaign.brand.user_id == current_user.id and deal.from_user_id != current_user.id:
-        can_respond = True
-    
-    if not can_respond:
+    if campaign_role(campaign) is None or deal.from_user_id == current_user.id:
         if request.is_json:
             return jsonify({'error': 'Permission denied'}), 403
         flash('Vous n\'avez pas la permission de répondre à cette offre.', 'danger')
@@ -138,7 +125,9 @@ def respond_to_deal(deal_id):
         # Reject the deal
         campaign.status = 'pending'
     
+    update_campaign_counters(campaign)
     db.session.commit()
+    invalidate_user_stats(campaign)
     
     if request.is_json:
         return jsonify({
@@ -154,17 +143,11 @@ def respond_to_deal(deal_id):
 @login_required
 def view_deal(deal_id):
     """View deal details"""
-    deal = Deal.query.get_or_404(deal_id)
+    deal = load_deal(deal_id)
     campaign = deal.campaign
     
     # Check permission
-    can_view = False
-    if current_user.user_type == 'podcast_host' and campaign.podcast.user_id == current_user.id:
-        can_view = True
-    elif current_user.user_type == 'brand' and campaign.brand.user_id == current_user.id:
-        can_view = True
-    
-    if not can_view:
+    if campaign_role(campaign) is None:
         if request.is_json:
             return jsonify({'error': 'Permission denied'}), 403
         flash('Vous n\'avez pas la permission de voir cette négociation.', 'danger')
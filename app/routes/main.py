@@ -1,11 +1,20 @@
 from flask import Blueprint, render_template, jsonify, request
 from flask_login import login_required, current_user
+from app import db
 from app.models import Podcast, Brand, Campaign
-from sqlalchemy import desc
+from app.utils.analytics import user_stats
+from app.utils.cache import response_cache
+from app.utils.demographics import AGE_BANDS
+from app.utils.engine import pool_metrics
+from app.utils.pagination import keyset_paginate
+from app.utils.search import search_index
+from sqlalchemy import desc, text
+from sqlalchemy.orm import contains_eager, joinedload
 
 main_bp = Blueprint('main', __name__)
 
 @main_bp.route('/')
+@response_cache.cached('podcasts')
 def index():
     """Home page"""
     # Get featured podcasts
@@ -24,37 +33,46 @@ def dashboard():
         # Podcast host dashboard
         podcasts = Podcast.query.filter_by(user_id=current_user.id).all()
         
-        # Get campaigns for user's podcasts
-        podcast_ids = [p.id for p in podcasts]
-        campaigns = Campaign.query.filter(
-            Campaign.podcast_id.in_(podcast_ids)
+        # Latest campaigns on the user's podcasts
+        campaigns = Campaign.query.join(
+            Podcast, Podcast.id == Campaign.podcast_id
+        ).filter(
+            Podcast.user_id == current_user.id
+        ).options(
+            contains_eager(Campaign.podcast)
         ).order_by(desc(Campaign.created_at)).limit(10).all()
         
         return render_template(
             'dashboard/podcast_host.html',
             podcasts=podcasts,
-            campaigns=campaigns
+            campaigns=campaigns,
+            stats=user_stats(current_user)
         )
     
     elif current_user.user_type == 'brand':
         # Brand dashboard
         brands = Brand.query.filter_by(user_id=current_user.id).all()
         
-        # Get campaigns for user's brands
-        brand_ids = [b.id for b in brands]
-        campaigns = Campaign.query.filter(
-            Campaign.brand_id.in_(brand_ids)
+        # Latest campaigns of the user's brands
+        campaigns = Campaign.query.join(
+            Brand, Brand.id == Campaign.brand_id
+        ).filter(
+            Brand.user_id == current_user.id
+        ).options(
+            joinedload(Campaign.podcast)
         ).order_by(desc(Campaign.created_at)).limit(10).all()
         
         return render_template(
             'dashboard/brand.html',
             brands=brands,
-            campaigns=campaigns
+            campaigns=campaigns,
+            stats=user_stats(current_user)
         )
     
     return render_template('dashboard/index.html')
 
 @main_bp.route('/marketplace')
+@response_cache.cached('podcasts')
 def marketplace():
     """Podcast marketplace - browse all podcasts"""
     category = request.args.get('category')
@@ -65,67 +83,72 @@ def marketplace():
     if category:
         query = query.filter_by(category=category)
     
-    if search:
-        query = query.filter(
-            Podcast.title.ilike(f'%{search}%') | 
-            Podcast.description.ilike(f'%{search}%')
-        )
+    # Audience filters run on the columns extracted from audience_demographics
+    country = request.args.get('country')
+    age = request.args.get('age')
+    gender = request.args.get('gender')
+    if country:
+        query = query.filter(Podcast.primary_country == country.upper())
+    if age:
+        query = query.filter(Podcast.primary_age_band == age)
+    if gender == 'female':
+        query = query.filter(Podcast.female_share > 0.5)
+    elif gender == 'male':
+        query = query.filter(Podcast.female_share < 0.5)
+    
+    # Search results are ranked by relevance, plain browsing by audience size
+    order_by = [Podcast.average_listeners, Podcast.id]
+    hits = search_index.podcast_hits(search) if search else None
+    if hits is not None:
+        query = query.join(hits, hits.c.id == Podcast.id)
+        order_by = [hits.c.score, Podcast.id]
     
-    podcasts = query.order_by(desc(Podcast.average_listeners)).all()
+    page = keyset_paginate(query, order_by, cursor=request.args.get('cursor'))
+    
+    if request.is_json:
+        return jsonify({
+            'podcasts': [p.to_dict() for p in page.items],
+            'pagination': page.to_dict()
+        }), 200
     
-    return render_template('marketplace.html', podcasts=podcasts)
+    return render_template('marketplace.html', podcasts=page.items, page=page, age_bands=AGE_BANDS)
 
 @main_bp.route('/about')
 def about():
     """About page"""
     return render_template('about.html')
 
+@main_bp.route('/health')
+def health():
+    """Liveness check with this worker's connection pool counters"""
+    db.session.execute(text('SELECT 1'))
+    return jsonify({'status': 'ok', 'database': pool_metrics(db)})
+
 @main_bp.route('/api/stats')
 @login_required
 def api_stats():
     """Get user statistics"""
+    stats = user_stats(current_user)
+    
     if current_user.user_type == 'podcast_host':
-        podcasts = Podcast.query.filter_by(user_id=current_user.id).all()
-        podcast_ids = [p.id for p in podcasts]
-        
-        total_podcasts = len(podcasts)
-        total_campaigns = Campaign.query.filter(
-            Campaign.podcast_id.in_(podcast_ids)
-        ).count()
-        active_campaigns = Campaign.query.filter(
-            Campaign.podcast_id.in_(podcast_ids),
-            Campaign.status == 'active'
-        ).count()
-        
-        total_listeners = sum(p.average_listeners for p in podcasts)
-        
         return jsonify({
-            'total_podcasts': total_podcasts,
-            'total_campaigns': total_campaigns,
-            'active_campaigns': active_campaigns,
-            'total_listeners': total_listeners
+            'total_podcasts': stats['total_podcasts'],
+            'total_campaigns': stats['total_campaigns'],
+            'active_campaigns': stats['active_campaigns'],
+            'total_listeners': stats['total_listeners'],
+            'total_impressions': stats['impressions'],
+            'total_conversions': stats['conversions']
         })
     
     elif current_user.user_type == 'brand':
-        brands = Brand.query.filter_by(user_id=current_user.id).all()
-        brand_ids = [b.id for b in brands]
-        
-        total_brands = len(brands)
-        total_campaigns = Campaign.query.filter(
-            Campaign.brand_id.in_(brand_ids)
-        ).count()
-        active_campaigns = Campaign.query.filter(
-            Campaign.brand_id.in_(brand_ids),
-            Campaign.status == 'active'
-        ).count()
-        
-        total_spent = sum(b.total_spent for b in brands)
-        
         return jsonify({
-            'total_brands': total_brands,
-            'total_campaigns': total_campaigns,
-            'active_campaigns': active_campaigns,
-            'total_spent': total_spent
+            'total_brands': stats['total_brands'],
+            'total_campaigns': stats['total_campaigns'],
+            'active_campaigns': stats['active_campaigns'],
+            'total_spent': stats['total_spent'],
+            'total_impressions': stats['impressions'],
+            'total_conversions': stats['conversions'],
+            'total_revenue': stats['revenue_generated']
         })
     
     return jsonify({'error': 'Invalid user type'}), 400
@@ -2,11 +2,17 @@ from flask import Blueprint, render_template, redirect, url_for, flash, request,
 from flask_login import login_required, current_user
 from app import db
 from app.models import Podcast
+from app.utils.pagination import keyset_paginate
+from app.utils.analytics import invalidate_user_stats
+from app.utils.cache import response_cache
+from app.utils.demographics import load_json
+from app.utils.search import search_index
 from sqlalchemy import desc
 
 podcasts_bp = Blueprint('podcasts', __name__, url_prefix='/podcasts')
 
 @podcasts_bp.route('/')
+@response_cache.cached('podcasts')
 def list_podcasts():
     """List all podcasts"""
     category = request.args.get('category')
@@ -17,20 +23,25 @@ def list_podcasts():
     if category:
         query = query.filter_by(category=category)
     
-    if search:
-        query = query.filter(
-            Podcast.title.ilike(f'%{search}%') | 
-            Podcast.description.ilike(f'%{search}%')
-        )
+    # Search results are ranked by relevance, plain browsing by audience size
+    order_by = [Podcast.average_listeners, Podcast.id]
+    hits = search_index.podcast_hits(search) if search else None
+    if hits is not None:
+        query = query.join(hits, hits.c.id == Podcast.id)
+        order_by = [hits.c.score, Podcast.id]
     
-    podcasts = query.order_by(desc(Podcast.average_listeners)).all()
+    page = keyset_paginate(query, order_by, cursor=request.args.get('cursor'))
     
     if request.is_json:
-        return jsonify({'podcasts': [p.to_dict() for p in podcasts]}), 200
+        return jsonify({
+            'podcasts': [p.to_dict() for p in page.items],
+            'pagination': page.to_dict()
+        }), 200
     
-    return render_template('podcasts/list.html', podcasts=podcasts)
+    return render_template('podcasts/list.html', podcasts=page.items, page=page)
 
 @podcasts_bp.route('/<int:podcast_id>')
+@response_cache.cached('podcast:{podcast_id}')
 def view_podcast(podcast_id):
     """View podcast details"""
     podcast = Podcast.query.get_or_404(podcast_id)
@@ -70,6 +81,7 @@ def create_podcast():
             language=data.get('language', 'fr'),
             average_listeners=int(data.get('average_listeners', 0)),
             total_episodes=int(data.get('total_episodes', 0)),
+            audience_demographics=load_json(data.get('audience_demographics')),
             min_rate=float(data.get('min_rate', 0)) if data.get('min_rate') else None,
             max_rate=float(data.get('max_rate', 0)) if data.get('max_rate') else None,
             rss_feed=data.get('rss_feed'),
@@ -79,7 +91,11 @@ def create_podcast():
         )
         
         db.session.add(podcast)
+        db.session.flush()
+        search_index.index_podcast(podcast)
         db.session.commit()
+        response_cache.invalidate('podcasts')
+        invalidate_user_stats(user_ids=[current_user.id])
         
         if request.is_json:
             return jsonify({
@@ -112,6 +128,8 @@ def edit_podcast(podcast_id):
         podcast.language = data.get('language', podcast.language)
         podcast.average_listeners = int(data.get('average_listeners', podcast.average_listeners))
         podcast.total_episodes = int(data.get('total_episodes', podcast.total_episodes))
+        if 'audience_demographics' in data:
+            podcast.audience_demographics = load_json(data.get('audience_demographics'))
         
         if data.get('min_rate'):
             podcast.min_rate = float(data.get('min_rate'))
@@ -124,7 +142,10 @@ def edit_podcast(podcast_id):
         podcast.website_url = data.get('website_url', podcast.website_url)
         podcast.is_accepting_ads = data.get('is_accepting_ads', 'true').lower() == 'true'
         
+        search_index.index_podcast(podcast)
         db.session.commit()
+        response_cache.invalidate('podcasts', f'podcast:{podcast.id}')
+        invalidate_user_stats(user_ids=[current_user.id])
         
         if request.is_json:
             return jsonify({
@@ -149,8 +170,11 @@ def delete_podcast(podcast_id):
         flash('Vous n\'avez pas la permission de supprimer ce podcast.', 'danger')
         return redirect(url_for('main.dashboard'))
     
+    search_index.remove_podcast(podcast.id)
     db.session.delete(podcast)
     db.session.commit()
+    response_cache.invalidate('podcasts', f'podcast:{podcast_id}')
+    invalidate_user_stats(user_ids=[current_user.id])
     
     if request.is_json:
         return jsonify({'message': 'Podcast deleted successfully'}), 200
@@ -0,0 +1,79 @@
+from flask import abort, g
+from flask_login import current_user
+from sqlalchemy.orm import contains_eager
+from app import db
+from app.models import Brand, Campaign, Deal, Podcast
+
+def _campaign_query():
+    return Campaign.query.join(
+        Podcast, Podcast.id == Campaign.podcast_id
+    ).join(
+        Brand, Brand.id == Campaign.brand_id
+    ).options(
+        contains_eager(Campaign.podcast),
+        contains_eager(Campaign.brand)
+    )
+
+def _key(kind, object_id):
+    try:
+        return (kind, int(object_id))
+    except (TypeError, ValueError):
+        abort(404)
+
+def _cache():
+    if '_access_cache' not in g:
+        g._access_cache = {}
+    return g._access_cache
+
+def load_campaign(campaign_id):
+    """Load a campaign with its podcast and brand in one joined query, or 404
+
+    The result is cached for the rest of the request, so repeated ownership
+    checks on the same campaign don't go back to the database.
+    """
+    cache = _cache()
+    key = _key('campaign', campaign_id)
+    if key not in cache:
+        campaign = _campaign_query().filter(Campaign.id == key[1]).first()
+        if campaign is None:
+            abort(404)
+        cache[key] = campaign
+    return cache[key]
+
+def load_deal(deal_id):
+    """Load a deal with its campaign, podcast and brand in one joined query, or 404"""
+    cache = _cache()
+    key = _key('deal', deal_id)
+    if key not in cache:
+        deal = db.session.query(Deal).join(
+            Campaign, Campaign.id == Deal.campaign_id
+        ).join(
+            Podcast, Podcast.id == Campaign.podcast_id
+        ).join(
+            Brand, Brand.id == Campaign.brand_id
+        ).options(
+            contains_eager(Deal.campaign).contains_eager(Campaign.podcast),
+            contains_eager(Deal.campaign).contains_eager(Campaign.brand)
+        ).filter(Deal.id == key[1]).first()
+        if deal is None:
+            abort(404)
+        cache[key] = deal
+        cache[('campaign', deal.campaign_id)] = deal.campaign
+    return cache[key]
+
+def campaign_role(campaign, user=None):
+    """The side of the campaign the user is on: 'podcast_host', 'brand' or None"""
+    user = user or current_user
+    if user.user_type == 'podcast_host' and campaign.podcast.user_id == user.id:
+        return 'podcast_host'
+    if user.user_type == 'brand' and campaign.brand.user_id == user.id:
+        return 'brand'
+    return None
+
+def is_podcast_owner(campaign, user=None):
+    """Whether the user hosts the podcast the campaign runs on"""
+    return campaign_role(campaign, user) == 'podcast_host'
+
+def is_brand_owner(campaign, user=None):
+    """Whether the user owns the brand running the campaign"""
+    return campaign_role(campaign, user) == 'brand'
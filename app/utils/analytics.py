@@ -0,0 +1,101 @@
+from sqlalchemy import func, select
+from app import db
+from app.models import Brand, BrandDailyStats, Podcast, PodcastDailyStats
+from app.utils.cache import response_cache
+from app.utils.counters import COUNTERS
+
+def performance_totals(source, *criteria):
+    """Sum the performance metrics of ``source`` matching ``criteria`` in a single query
+
+    ``source`` is AdPerformance or one of the daily rollup models, which share
+    its metric column names.
+    """
+    row = db.session.query(
+        func.coalesce(func.sum(source.impressions), 0).label('impressions'),
+        func.coalesce(func.sum(source.unique_listeners), 0).label('unique_listeners'),
+        func.coalesce(func.sum(source.click_throughs), 0).label('clicks'),
+        func.coalesce(func.sum(source.promo_code_uses), 0).label('promo_uses'),
+        func.coalesce(func.sum(source.conversions), 0).label('conversions'),
+        func.coalesce(func.sum(source.revenue_generated), 0.0).label('revenue')
+    ).filter(*criteria).one()
+    return row._asdict()
+
+def _owner_stats(owner, rollup, rollup_key, metrics, user_id, **owner_totals):
+    """Totals over one user's podcasts or brands in a single statement
+
+    Campaign counts come from the owners' counter columns; rollup sums are
+    grouped per podcast/brand in a derived table, so joining it to the
+    owner's rows never multiplies a total.
+    """
+    performance = select(
+        rollup_key.label('owner_id'),
+        *[func.sum(getattr(rollup, metric)).label(metric) for metric in metrics]
+    ).join(owner, owner.id == rollup_key).where(owner.user_id == user_id).group_by(rollup_key).subquery()
+
+    columns = [func.count(owner.id).label('owners')]
+    columns += [func.coalesce(func.sum(column), 0).label(name) for name, column in owner_totals.items()]
+    columns += [func.coalesce(func.sum(getattr(owner, counter)), 0).label(counter) for counter in COUNTERS]
+    columns += [func.coalesce(func.sum(performance.c[metric]), 0).label(metric) for metric in metrics]
+    row = db.session.execute(
+        select(*columns).select_from(owner)
+        .outerjoin(performance, performance.c.owner_id == owner.id)
+        .where(owner.user_id == user_id)
+    ).one()
+    return row._asdict()
+
+def podcast_host_stats(user_id):
+    """Podcast, campaign and audience totals of a podcast host"""
+    stats = _owner_stats(
+        Podcast, PodcastDailyStats, PodcastDailyStats.podcast_id,
+        ('impressions', 'conversions'), user_id,
+        total_listeners=Podcast.average_listeners,
+        total_revenue=Podcast.total_revenue
+    )
+    stats['total_podcasts'] = stats.pop('owners')
+    return stats
+
+def brand_stats(user_id):
+    """Brand, campaign, spend and performance totals of a brand user"""
+    stats = _owner_stats(
+        Brand, BrandDailyStats, BrandDailyStats.brand_id,
+        ('impressions', 'conversions', 'revenue_generated'), user_id,
+        total_spent=Brand.total_spent
+    )
+    stats['total_brands'] = stats.pop('owners')
+    return stats
+
+def user_stats(user):
+    """The dashboard totals of ``user``, cached until one of its campaigns changes
+
+    Only memoized with a cache shared between workers: the totals are cheap
+    counter reads, and a per-process copy would be invalidated in one worker
+    while the others kept serving stale numbers.
+    """
+    compute = {'podcast_host': podcast_host_stats, 'brand': brand_stats}.get(user.user_type)
+    if compute is None:
+        return None
+    if not response_cache.backend.shared:
+        return compute(user.id)
+    return response_cache.memoize(
+        f'user-stats:{user.id}', lambda: compute(user.id), f'user-stats:{user.id}'
+    )
+
+def invalidate_brand_pages(*brand_ids):
+    """Drop the cached public pages of brands whose total_spent moved"""
+    if brand_ids:
+        response_cache.invalidate('brands', *[f'brand:{brand_id}' for brand_id in set(brand_ids)])
+
+def invalidate_user_stats(*campaigns, user_ids=()):
+    """Drop the cached totals of the host and brand on each campaign, and of ``user_ids``
+
+    Campaign writes may also move the brand's spend ledger balance, so the
+    public pages of the campaigns' brands are dropped too, whatever the
+    backend.
+    """
+    invalidate_brand_pages(*[campaign.brand_id for campaign in campaigns])
+    if not response_cache.backend.shared:
+        return
+    owners = set(user_ids)
+    for campaign in campaigns:
+        owners.update((campaign.podcast.user_id, campaign.brand.user_id))
+    response_cache.invalidate(*[f'user-stats:{user_id}' for user_id in owners])
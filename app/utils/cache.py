@@ -0,0 +1,231 @@
+import hashlib
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, request, session
+from flask_login import current_user
+
+# Headers that belong to a single response and are never replayed from the cache
+_SKIPPED_HEADERS = {'set-cookie', 'content-length', 'etag', 'last-modified', 'vary'}
+
+class NullBackend:
+    """Backend that stores nothing, for turning the cache off"""
+    name = 'null'
+    shared = False
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, timeout):
+        pass
+
+    def delete(self, key):
+        pass
+
+    def generation(self, tag):
+        return 0
+
+    def bump(self, tag):
+        pass
+
+class SimpleBackend:
+    """In-process LRU cache with a per-entry TTL
+
+    Each worker process keeps its own copy, so invalidations only reach the
+    process that handled the write; use the redis backend when running more
+    than one worker.
+    """
+    name = 'simple'
+    shared = False
+
+    def __init__(self, threshold=1000):
+        self.threshold = threshold
+        self._entries = OrderedDict()
+        # Generations live outside the LRU: evicting one would bring back
+        # entries that were invalidated
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.threshold:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def generation(self, tag):
+        return self._generations.get(tag, 0)
+
+    def bump(self, tag):
+        with self._lock:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+
+class RedisBackend:
+    """Backend for Redis or any server speaking its protocol (Valkey, KeyDB...)
+
+    ``client`` is anything with redis-py's ``get``/``set``/``incr`` methods,
+    which is how a local stand-in such as fakeredis can be plugged in.
+    """
+    name = 'redis'
+    shared = True
+
+    def __init__(self, client, prefix=''):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url, prefix=''):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError('CACHE_BACKEND=redis requires the redis package')
+        return cls(redis.Redis.from_url(url), prefix)
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        return pickle.loads(value) if value is not None else None
+
+    def set(self, key, value, timeout):
+        self.client.set(self.prefix + key, pickle.dumps(value), ex=timeout)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def generation(self, tag):
+        return int(self.client.get(f'{self.prefix}gen:{tag}') or 0)
+
+    def bump(self, tag):
+        self.client.incr(f'{self.prefix}gen:{tag}')
+
+class CachedResponse:
+    """The parts of a rendered response needed to replay it"""
+
+    def __init__(self, body, status, headers):
+        self.body = body
+        self.status = status
+        self.headers = headers
+        # No Last-Modified: the fill time isn't when the data changed, so
+        # revalidation relies on the ETag alone
+        self.etag = hashlib.md5(body).hexdigest()
+
+    @classmethod
+    def from_response(cls, response):
+        headers = [
+            (name, value) for name, value in response.headers.items()
+            if name.lower() not in _SKIPPED_HEADERS
+        ]
+        return cls(response.get_data(), response.status_code, headers)
+
+    def to_response(self):
+        response = current_app.response_class(self.body, status=self.status, headers=self.headers)
+        response.set_etag(self.etag)
+        return response
+
+class ResponseCache:
+    """Cache of rendered pages and JSON payloads for the public catalog
+
+    Views declare the tags their output depends on (``'podcasts'`` for lists,
+    ``'podcast:{podcast_id}'`` for a detail page); writes call ``invalidate``
+    with the same tags. Invalidation bumps a per-tag generation that is part
+    of every cache key, so stale entries are simply never read again and age
+    out through the TTL / LRU instead of being looked up and deleted.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('CACHE_BACKEND', 'simple')
+        app.config.setdefault('CACHE_DEFAULT_TIMEOUT', 300)
+        app.config.setdefault('CACHE_THRESHOLD', 1000)
+        app.config.setdefault('CACHE_KEY_PREFIX', 'podcastmarket:')
+        name = app.config['CACHE_BACKEND']
+        if name == 'redis':
+            backend = RedisBackend.from_url(app.config['CACHE_REDIS_URL'], app.config['CACHE_KEY_PREFIX'])
+        elif name == 'simple':
+            backend = SimpleBackend(app.config['CACHE_THRESHOLD'])
+        else:
+            backend = NullBackend()
+        app.extensions['response_cache'] = backend
+
+    @property
+    def backend(self):
+        return current_app.extensions['response_cache']
+
+    def invalidate(self, *tags):
+        """Drop every cached response tagged with one of ``tags``"""
+        for tag in tags:
+            self.backend.bump(tag)
+
+    def memoize(self, key, compute, *tags, timeout=None):
+        """The value cached under ``key`` and ``tags``, from ``compute()`` on a miss"""
+        generations = [f'{tag}={self.backend.generation(tag)}' for tag in tags]
+        key = 'data:' + hashlib.sha1('|'.join([key] + generations).encode('utf-8')).hexdigest()
+        value = self.backend.get(key)
+        if value is None:
+            value = compute()
+            self.backend.set(key, value, timeout or current_app.config['CACHE_DEFAULT_TIMEOUT'])
+        return value
+
+    def _cacheable(self):
+        if request.method not in ('GET', 'HEAD'):
+            return False
+        # Pending flash messages are rendered into the page and consumed
+        if '_flashes' in session:
+            return False
+        # JSON payloads don't depend on the viewer; pages do (navigation bar,
+        # owner actions), so only anonymous pages are shared
+        return request.is_json or not current_user.is_authenticated
+
+    def _key(self, tags):
+        generations = [f'{tag}={self.backend.generation(tag)}' for tag in tags]
+        source = '|'.join([request.endpoint, request.full_path, str(request.is_json)] + generations)
+        return 'view:' + hashlib.sha1(source.encode('utf-8')).hexdigest()
+
+    def cached(self, *tags, timeout=None):
+        """Cache a view's 200 responses under ``tags``, formatted with the view arguments"""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self._cacheable():
+                    return view(*args, **kwargs)
+
+                key = self._key([tag.format(**kwargs) for tag in tags])
+                entry = self.backend.get(key)
+                status = 'HIT'
+                if entry is None:
+                    response = current_app.make_response(view(*args, **kwargs))
+                    if response.status_code != 200 or response.is_streamed:
+                        return response
+                    entry = CachedResponse.from_response(response)
+                    self.backend.set(key, entry, timeout or current_app.config['CACHE_DEFAULT_TIMEOUT'])
+                    status = 'MISS'
+
+                response = entry.to_response()
+                response.headers['X-Cache'] = status
+                # Clients may keep the page but must revalidate it with the ETag
+                response.headers['Cache-Control'] = 'no-cache'
+                return response.make_conditional(request)
+            return wrapper
+        return decorator
+
+response_cache = ResponseCache()
@@ -0,0 +1,106 @@
+import math
+from sqlalchemy import case, func, inspect, select, update
+from app import db
+from app.models import Brand, Campaign, Podcast
+from app.models.campaign import CampaignCountersMixin
+from app.utils.ledger import record_campaign_spend
+
+COUNTERS = ('total_campaigns',) + tuple(f'{status}_campaigns' for status in CampaignCountersMixin.COUNTED_STATUSES)
+
+# Counted model -> (Campaign column it is keyed by, delivered cost column);
+# a brand's spend is kept by the spend ledger instead (app.utils.ledger)
+OWNERS = (
+    (Podcast, Campaign.podcast_id, 'total_revenue'),
+    (Brand, Campaign.brand_id, None),
+)
+
+def _contribution(status, negotiated_rate, episodes_completed):
+    """What one campaign adds to the counters of its podcast and brand"""
+    counts = {'total_campaigns': 1}
+    counts.update({f'{s}_campaigns': int(status == s) for s in CampaignCountersMixin.COUNTED_STATUSES})
+    return counts, (negotiated_rate or 0) * (episodes_completed or 0)
+
+def _previous(campaign, name):
+    history = inspect(campaign).attrs[name].history
+    return history.deleted[0] if history.deleted else getattr(campaign, name)
+
+def _increment(model, row_id, amounts):
+    amounts = {name: amount for name, amount in amounts.items() if amount}
+    if amounts:
+        values = {name: getattr(model, name) + amount for name, amount in amounts.items()}
+        # A counter change is not an edit of the podcast or brand itself
+        values['updated_at'] = model.updated_at
+        db.session.execute(
+            update(model).where(model.id == row_id).values(values)
+            .execution_options(synchronize_session=False)
+        )
+
+def update_campaign_counters(*campaigns, delivered_on=()):
+    """Apply the changes of new or modified campaigns to their podcast and brand counters
+
+    Call after changing a campaign's status, negotiated rate or delivered
+    episodes, before anything flushes the session: previous values are read
+    from the attribute history, and an unflushed new campaign counts in full.
+    Counters are incremented in SQL (``SET x = x + n``) so concurrent
+    transactions never overwrite each other, and commit or roll back with the
+    campaign change itself. Delivered episodes and rate changes also append
+    the brand's spend ledger entries; pass the tracked dates of the episodes
+    just delivered as ``delivered_on`` (one campaign at a time) to date them
+    on their delivery days.
+    """
+    # Read every delta first; the UPDATEs below autoflush the session
+    changes = []
+    for campaign in campaigns:
+        counts, cost = _contribution(campaign.status, campaign.negotiated_rate, campaign.episodes_completed)
+        previous = (None, None, 0)
+        if not inspect(campaign).pending:
+            previous = tuple(_previous(campaign, name) for name in ('status', 'negotiated_rate', 'episodes_completed'))
+            previous_counts, previous_cost = _contribution(*previous)
+            counts = {name: count - previous_counts[name] for name, count in counts.items()}
+            cost -= previous_cost
+        changes.append((campaign, counts, cost, previous))
+
+    for campaign, counts, cost, (_, previous_rate, previous_episodes) in changes:
+        _increment(Podcast, campaign.podcast_id, dict(counts, total_revenue=cost))
+        _increment(Brand, campaign.brand_id, counts)
+        record_campaign_spend(campaign, previous_rate, previous_episodes, delivered_on)
+
+def recount_campaigns(fix=True):
+    """Recompute every podcast and brand counter from the campaigns table
+
+    Returns ({table name: drifted row count}, ids of the users owning a
+    drifted row). Only drifted rows are written, and none if ``fix`` is false.
+    Brand spend is reconciled by app.utils.ledger.reconcile_spend.
+    """
+    drifted, owners = {}, set()
+    for model, foreign_key, cost_column in OWNERS:
+        expected = {
+            row[0]: row[1:]
+            for row in db.session.execute(
+                select(
+                    foreign_key,
+                    func.count(Campaign.id),
+                    *[func.count(case((Campaign.status == status, 1)))
+                      for status in CampaignCountersMixin.COUNTED_STATUSES],
+                    func.coalesce(func.sum(Campaign.negotiated_rate * Campaign.episodes_completed), 0.0)
+                ).group_by(foreign_key)
+            )
+        }
+        zero = (0,) * len(COUNTERS) + (0.0,)
+        names = COUNTERS + ((cost_column,) if cost_column else ())
+
+        updates = []
+        for row_id, user_id, *stored in db.session.execute(
+            select(model.id, model.user_id, *[getattr(model, name) for name in names])
+        ):
+            wanted = expected.get(row_id, zero)[:len(names)]
+            # Costs are float sums, compared to the cent
+            if all(math.isclose(value or 0, target, abs_tol=0.005) for value, target in zip(stored, wanted)):
+                continue
+            updates.append(dict(zip(('id',) + names, (row_id, *wanted))))
+            owners.add(user_id)
+
+        drifted[model.__tablename__] = len(updates)
+        if fix and updates:
+            db.session.execute(update(model), updates)
+    return drifted, owners
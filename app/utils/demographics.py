@@ -0,0 +1,68 @@
+import json
+
+# Older free-form demographics used other names for the same dimension
+DIMENSION_ALIASES = {'location': 'country', 'ages': 'age', 'sex': 'gender'}
+
+AGE_BANDS = ('18-24', '25-34', '35-44', '45-54', '55+')
+
+def load_json(value, default=None):
+    """A JSON column value, whether already decoded or still stored as text"""
+    if value is None or value == '':
+        return default
+    if not isinstance(value, str):
+        return value
+    try:
+        return json.loads(value)
+    except ValueError:
+        return default
+
+def category_list(value):
+    """Preferred categories from a JSON array or a comma-separated form field"""
+    categories = load_json(value)
+    if categories is None and isinstance(value, str):
+        categories = value.split(',')
+    if isinstance(categories, str):
+        categories = [categories]
+    if not isinstance(categories, list):
+        return None
+    return [str(category).strip() for category in categories if str(category).strip()] or None
+
+def demographic_shares(value):
+    """{(dimension, segment): share}, the shares of each dimension summing to 1
+
+    Demographics are objects of dimensions (age, gender, country), each
+    either a {segment: weight} object or a list of segments weighted equally:
+    ``{"age": {"25-34": 0.6, "35-44": 0.4}, "country": ["FR", "BE"]}``.
+    """
+    shares = {}
+    data = load_json(value, {})
+    if not isinstance(data, dict):
+        return shares
+    for dimension, segments in data.items():
+        dimension = DIMENSION_ALIASES.get(dimension, dimension)
+        if isinstance(segments, list):
+            segments = dict.fromkeys(segments, 1)
+        if not isinstance(segments, dict):
+            continue
+        weights = {str(segment): float(weight) for segment, weight in segments.items()
+                   if isinstance(weight, (int, float)) and weight > 0}
+        total = sum(weights.values())
+        for segment, weight in weights.items():
+            shares[(dimension, segment)] = weight / total
+    return shares
+
+def audience_profile(value):
+    """The filterable summary of an audience: primary age band, female share, primary country"""
+    shares = demographic_shares(value)
+
+    def primary(dimension):
+        candidates = [(share, segment) for (name, segment), share in shares.items() if name == dimension]
+        return max(candidates)[1] if candidates else None
+
+    has_gender = any(name == 'gender' for name, _ in shares)
+    country = primary('country')
+    return {
+        'primary_age_band': primary('age'),
+        'female_share': round(shares.get(('gender', 'female'), 0.0), 4) if has_gender else None,
+        'primary_country': country.upper() if country else None,
+    }
@@ -0,0 +1,113 @@
+import threading
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that counts checkouts and measures how long they wait
+
+    A checkout waits when every pooled connection is in use; a steadily
+    growing checkout time means the pool (or the database) is too small for
+    the number of worker threads.
+    """
+    # Log as the stock QueuePool: under app.* the pool's per-checkout debug
+    # lines would inherit the Flask logger's DEBUG level
+    _sqla_logger_namespace = 'sqlalchemy.pool.impl.QueuePool'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.checkout_seconds = 0.0
+        self.checkout_seconds_max = 0.0
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._stats_lock:
+                self.checkouts += 1
+                self.checkout_seconds += elapsed
+                self.checkout_seconds_max = max(self.checkout_seconds_max, elapsed)
+
+def _is_memory_sqlite(url):
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+def engine_options(app):
+    """Fill SQLALCHEMY_ENGINE_OPTIONS from the DB_POOL_* settings of the config class
+
+    Must run before db.init_app. In-memory SQLite keeps Flask-SQLAlchemy's
+    single shared connection, file SQLite only gets the instrumented pool
+    (pre-ping and recycling are pointless without a server) and server
+    databases get the full pool tuning. Explicit SQLALCHEMY_ENGINE_OPTIONS
+    entries always win.
+    """
+    url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    if _is_memory_sqlite(url):
+        return
+
+    options = {'poolclass': TimedQueuePool}
+    if url.get_backend_name() != 'sqlite':
+        options.update(
+            pool_size=app.config['DB_POOL_SIZE'],
+            max_overflow=app.config['DB_MAX_OVERFLOW'],
+            pool_timeout=app.config['DB_POOL_TIMEOUT'],
+            pool_recycle=app.config['DB_POOL_RECYCLE'],
+            pool_pre_ping=app.config['DB_POOL_PRE_PING'],
+        )
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+def _set_sqlite_pragmas(pragmas):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+    return on_connect
+
+def init_engines(app, db):
+    """Apply SQLITE_PRAGMAS to every new SQLite connection
+
+    WAL lets readers carry on while a writer commits, synchronous=NORMAL
+    only fsyncs at checkpoints (safe in WAL mode), busy_timeout makes
+    concurrent writers wait for the lock instead of failing, and mmap_size
+    serves reads from the page cache without copying.
+    """
+    pragmas = app.config.get('SQLITE_PRAGMAS')
+    if not pragmas:
+        return
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == 'sqlite':
+                event.listen(engine, 'connect', _set_sqlite_pragmas(pragmas))
+
+def pool_metrics(db):
+    """Connection pool counters of each engine, by bind ('default' for the main one)"""
+    metrics = {}
+    for key, engine in db.engines.items():
+        pool = engine.pool
+        data = {'pool': type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            data.update(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                overflow=pool.overflow(),
+            )
+        if isinstance(pool, TimedQueuePool):
+            data.update(
+                checkouts=pool.checkouts,
+                timeouts=pool.timeouts,
+                checkout_seconds_total=round(pool.checkout_seconds, 6),
+                checkout_seconds_max=round(pool.checkout_seconds_max, 6),
+            )
+        metrics[key or 'default'] = data
+    return metrics
@@ -0,0 +1,126 @@
+import re
+from datetime import datetime
+from sqlalchemy import desc, func, text
+from app import db
+from app.models import Podcast, Brand, Campaign, Deal, AdPerformance, CampaignDailyStats, BrandDailyStats
+from app.utils.search import search_index
+
+SAMPLE_ID = 1
+SAMPLE_IDS = [1, 2, 3]
+
+def hot_queries():
+    """Representative queries issued by each route, keyed by endpoint"""
+    queries = [
+        ('main.index', Podcast.query.filter_by(
+            is_active=True, is_accepting_ads=True
+        ).order_by(desc(Podcast.average_listeners)).limit(6)),
+        ('main.marketplace', Podcast.query.filter_by(
+            is_active=True, is_accepting_ads=True
+        ).order_by(desc(Podcast.average_listeners), desc(Podcast.id)).limit(21)),
+        ('main.marketplace?category', Podcast.query.filter_by(
+            is_active=True, is_accepting_ads=True, category='Technology'
+        ).order_by(desc(Podcast.average_listeners), desc(Podcast.id)).limit(21)),
+        ('main.marketplace?country&age', Podcast.query.filter_by(
+            is_active=True, is_accepting_ads=True, primary_country='FR', primary_age_band='25-34'
+        ).order_by(desc(Podcast.average_listeners), desc(Podcast.id)).limit(21)),
+        ('main.marketplace?age', Podcast.query.filter_by(
+            is_active=True, is_accepting_ads=True, primary_age_band='25-34'
+        ).order_by(desc(Podcast.average_listeners), desc(Podcast.id)).limit(21)),
+        ('main.dashboard[podcast_host]', Campaign.query.filter(
+            Campaign.podcast_id.in_(SAMPLE_IDS)
+        ).order_by(desc(Campaign.created_at)).limit(10)),
+        ('main.dashboard[brand]', Campaign.query.filter(
+            Campaign.brand_id.in_(SAMPLE_IDS)
+        ).order_by(desc(Campaign.created_at)).limit(10)),
+        ('main.api_stats[podcast_host]', Campaign.query.filter(
+            Campaign.podcast_id.in_(SAMPLE_IDS),
+            Campaign.status == 'active'
+        )),
+        ('main.api_stats[brand]', Campaign.query.filter(
+            Campaign.brand_id.in_(SAMPLE_IDS),
+            Campaign.status == 'active'
+        )),
+        ('podcasts.list_podcasts', Podcast.query.filter_by(
+            is_active=True
+        ).order_by(desc(Podcast.average_listeners), desc(Podcast.id)).limit(21)),
+        ('podcasts.my_podcasts', Podcast.query.filter_by(
+            user_id=SAMPLE_ID
+        ).order_by(desc(Podcast.created_at))),
+        ('brands.list_brands', Brand.query.filter_by(
+            is_active=True
+        ).order_by(desc(Brand.created_at))),
+        ('brands.my_brands', Brand.query.filter_by(
+            user_id=SAMPLE_ID
+        ).order_by(desc(Brand.created_at))),
+        ('campaigns.list_campaigns', Campaign.query.filter(
+            Campaign.brand_id.in_(SAMPLE_IDS)
+        ).order_by(desc(Campaign.created_at))),
+        ('deals.campaign_deals', Deal.query.filter_by(
+            campaign_id=SAMPLE_ID
+        ).order_by(Deal.created_at)),
+        ('analytics.campaign_analytics', db.session.query(
+            func.sum(CampaignDailyStats.impressions)
+        ).filter(CampaignDailyStats.campaign_id == SAMPLE_ID)),
+        ('analytics.campaign_analytics?records', AdPerformance.query.filter_by(
+            campaign_id=SAMPLE_ID
+        ).order_by(desc(AdPerformance.tracked_date), desc(AdPerformance.id)).limit(21)),
+        ('analytics.podcast_analytics', db.session.query(
+            Campaign.status, func.count(Campaign.id)
+        ).filter(Campaign.podcast_id == SAMPLE_ID).group_by(Campaign.status)),
+        ('analytics.brand_analytics', db.session.query(
+            func.sum(BrandDailyStats.impressions)
+        ).filter(BrandDailyStats.brand_id == SAMPLE_ID)),
+        ('brands.recommendations[sync]', Podcast.query.filter(
+            Podcast.updated_at >= datetime(2026, 1, 1)
+        )),
+    ]
+
+    hits = search_index.podcast_hits('tech')
+    queries.append(('main.marketplace?search', Podcast.query.filter_by(
+        is_active=True, is_accepting_ads=True
+    ).join(hits, hits.c.id == Podcast.id).order_by(desc(hits.c.score), desc(Podcast.id)).limit(21)))
+
+    return queries
+
+def explain(query):
+    """Return the plan lines of a query on the current database"""
+    statement = query.statement if hasattr(query, 'statement') else query
+    dialect = db.engine.dialect
+    sql = str(statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+
+    if dialect.name == 'sqlite':
+        rows = db.session.execute(text('EXPLAIN QUERY PLAN ' + sql)).fetchall()
+        return [row[-1] for row in rows]
+
+    if dialect.name == 'postgresql':
+        # Tiny tables are always cheaper to scan; only report scans no index can avoid
+        db.session.execute(text('SET LOCAL enable_seqscan = off'))
+        rows = db.session.execute(text('EXPLAIN ' + sql)).fetchall()
+        return [row[0] for row in rows]
+
+    raise ValueError(f'EXPLAIN is not supported for dialect {dialect.name}')
+
+_FULL_SCAN = {
+    # "SCAN podcasts" reads the table; "SCAN podcasts USING INDEX ..." walks an index in order
+    'sqlite': re.compile(r'^SCAN (\w+)\b(?! USING (?:COVERING )?INDEX)'),
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+}
+
+def full_scans(plan):
+    """Plan lines that read a whole model table"""
+    pattern = _FULL_SCAN[db.engine.dialect.name]
+    scans = []
+    for line in plan:
+        match = pattern.search(line.strip(' ->'))
+        if match and match.group(1) in db.metadata.tables:
+            scans.append(line)
+    return scans
+
+def check_query_plans():
+    """EXPLAIN every hot query, returning a list of (endpoint, plan, full_scans)"""
+    results = []
+    for endpoint, query in hot_queries():
+        plan = explain(query)
+        results.append((endpoint, plan, full_scans(plan)))
+    db.session.rollback()
+    return results
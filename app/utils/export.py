@@ -0,0 +1,75 @@
+import csv
+import json
+from datetime import date, datetime
+from flask import Response, stream_with_context
+from sqlalchemy import select
+from app import db
+from app.models import AdPerformance
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+EXPORT_COLUMNS = (
+    'id', 'campaign_id', 'episode_title', 'episode_date', 'episode_number',
+    'impressions', 'unique_listeners', 'click_throughs', 'promo_code_uses',
+    'conversions', 'revenue_generated', 'tracked_date', 'created_at'
+)
+
+# Rows fetched per round-trip from the server-side cursor
+YIELD_PER = 1000
+
+class _Line:
+    """File-like target for csv.writer that hands back each formatted line"""
+
+    def write(self, value):
+        return value
+
+def _plain(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+def _csv_lines(rows):
+    writer = csv.writer(_Line())
+    yield writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        yield writer.writerow([_plain(value) for value in row])
+
+def _ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(dict(zip(EXPORT_COLUMNS, map(_plain, row)))) + '\n'
+
+def _batched(lines, size=YIELD_PER):
+    """Join lines into larger chunks so the WSGI server isn't called per row"""
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= size:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+def export_performance(fmt, filename, *criteria):
+    """Stream the AdPerformance rows matching ``criteria`` as CSV or NDJSON
+
+    Rows are read as plain tuples through a server-side cursor, so memory use
+    stays flat regardless of the export size and the first bytes go out as
+    soon as the first batch is fetched.
+    """
+    statement = select(
+        *[getattr(AdPerformance, column) for column in EXPORT_COLUMNS]
+    ).where(*criteria).order_by(AdPerformance.id).execution_options(yield_per=YIELD_PER)
+
+    def generate():
+        rows = db.session.execute(statement)
+        lines = _csv_lines(rows) if fmt == 'csv' else _ndjson_lines(rows)
+        yield from _batched(lines)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype=EXPORT_FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename={filename}.{fmt}'}
+    )
@@ -0,0 +1,96 @@
+import json
+from datetime import datetime
+
+INTEGER_FIELDS = (
+    'impressions', 'unique_listeners', 'click_throughs',
+    'promo_code_uses', 'conversions'
+)
+
+class RowError(ValueError):
+    """A performance row that cannot be ingested"""
+
+def _date(value, field):
+    if value in (None, ''):
+        return None
+    try:
+        return datetime.strptime(str(value), '%Y-%m-%d').date()
+    except ValueError:
+        raise RowError(f'{field} must be a YYYY-MM-DD date')
+
+def _number(value, field, cast):
+    try:
+        number = cast(value)
+    except (TypeError, ValueError):
+        raise RowError(f'{field} must be a number')
+    if number < 0:
+        raise RowError(f'{field} must not be negative')
+    return number
+
+def validate_row(data):
+    """Turn a raw payload row into AdPerformance column values, raising RowError"""
+    if not isinstance(data, dict):
+        raise RowError('Row must be a JSON object')
+
+    if not data.get('campaign_id'):
+        raise RowError('Campaign ID required')
+
+    row = {
+        'campaign_id': _number(data['campaign_id'], 'campaign_id', int),
+        'episode_title': data.get('episode_title'),
+        'episode_date': _date(data.get('episode_date'), 'episode_date'),
+        'episode_number': _number(data.get('episode_number', 1), 'episode_number', int),
+        'revenue_generated': _number(data.get('revenue_generated', 0), 'revenue_generated', float),
+        # Set explicitly so the rollups know the day without reading rows back
+        'tracked_date': _date(data.get('tracked_date'), 'tracked_date') or datetime.utcnow().date(),
+    }
+    for field in INTEGER_FIELDS:
+        row[field] = _number(data.get(field, 0), field, int)
+    return row
+
+def _iter_ndjson(stream):
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield RowError('Invalid JSON')
+
+def iter_payload(request):
+    """Return an iterator over the raw rows of a bulk request
+
+    Accepts a JSON array (or ``{"records": [...]}``) or an NDJSON body. NDJSON
+    is read line by line from the request stream so large uploads never sit in
+    memory as a whole; lines that are not valid JSON come through as RowError
+    instances so they can be reported per row. Raises ValueError when the body
+    is neither.
+    """
+    if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        return _iter_ndjson(request.stream)
+
+    payload = request.get_json(silent=True)
+    if isinstance(payload, dict):
+        payload = payload.get('records')
+    if not isinstance(payload, list):
+        raise ValueError('Expected a JSON array of records or an NDJSON stream')
+    return iter(payload)
+
+def chunked(iterable, size):
+    """Split an iterable into lists of at most ``size`` items"""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def complete_episodes(campaign, count=1):
+    """Record delivered episodes on a campaign, completing it when all are done"""
+    campaign.episodes_completed += count
+
+    if campaign.episodes_completed >= campaign.total_episodes:
+        campaign.status = 'completed'
+        campaign.completed_at = datetime.utcnow()
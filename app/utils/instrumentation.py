@@ -0,0 +1,258 @@
+import cProfile
+import hmac
+import os
+import random
+import threading
+import time
+from datetime import datetime
+from flask import Response, abort, before_render_template, g, has_request_context, request, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.utils.engine import pool_metrics
+
+# Histogram upper bounds per kind of measurement
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+class Counter:
+    """Prometheus counter, one series per label set"""
+    kind = 'counter'
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self.series = {}
+
+    def inc(self, labels, value=1):
+        self.series[labels] = self.series.get(labels, 0) + value
+
+    def samples(self):
+        for labels, value in sorted(self.series.items()):
+            yield f'{self.name}{_labels(labels)} {value}'
+
+class Histogram:
+    """Prometheus histogram, one series of cumulative buckets per label set"""
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.series = {}
+
+    def observe(self, labels, value):
+        counts, total, observed = self.series.get(labels, ((0,) * len(self.buckets), 0, 0))
+        counts = tuple(count + (value <= bound) for count, bound in zip(counts, self.buckets))
+        self.series[labels] = (counts, total + value, observed + 1)
+
+    def samples(self):
+        for labels, (counts, total, observed) in sorted(self.series.items()):
+            for bound, count in zip(self.buckets, counts):
+                yield f'{self.name}_bucket{_labels(labels + (("le", bound),))} {count}'
+            yield f'{self.name}_bucket{_labels(labels + (("le", "+Inf"),))} {observed}'
+            yield f'{self.name}_sum{_labels(labels)} {round(total, 6)}'
+            yield f'{self.name}_count{_labels(labels)} {observed}'
+
+class RequestMetrics:
+    """Per-endpoint request measurements of this process
+
+    Each gunicorn worker keeps its own numbers, so a scrape of /metrics
+    describes the worker that answered it; scrape every worker (or run one
+    per container) to aggregate them.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = Counter('podcastmarket_requests_total', 'Requests handled, by endpoint, method and status')
+        self.duration = Histogram('podcastmarket_request_duration_seconds', 'Wall time spent in the application per request', DURATION_BUCKETS)
+        self.sql_statements = Histogram('podcastmarket_request_sql_statements', 'SQL statements issued per request', COUNT_BUCKETS)
+        self.sql_duration = Histogram('podcastmarket_request_sql_seconds', 'Time spent executing SQL per request', DURATION_BUCKETS)
+        self.template_duration = Histogram('podcastmarket_request_template_seconds', 'Time spent rendering templates per request', DURATION_BUCKETS)
+        self.response_size = Histogram('podcastmarket_response_size_bytes', 'Response body size (streamed responses excluded)', SIZE_BUCKETS)
+        self.metrics = (
+            self.requests, self.duration, self.sql_statements,
+            self.sql_duration, self.template_duration, self.response_size,
+        )
+
+    def record(self, endpoint, method, status, sample, size):
+        labels = (('endpoint', endpoint),)
+        with self.lock:
+            self.requests.inc(labels + (('method', method), ('status', status)))
+            self.duration.observe(labels, sample['wall'])
+            self.sql_statements.observe(labels, sample['sql_count'])
+            self.sql_duration.observe(labels, sample['sql_time'])
+            self.template_duration.observe(labels, sample['template_time'])
+            if size is not None:
+                self.response_size.observe(labels, size)
+
+    def expose(self, db):
+        """The Prometheus text exposition of every metric, plus the pool gauges"""
+        lines = []
+        with self.lock:
+            for metric in self.metrics:
+                lines.append(f'# HELP {metric.name} {metric.help_text}')
+                lines.append(f'# TYPE {metric.name} {metric.kind}')
+                lines.extend(metric.samples())
+        pools = pool_metrics(db)
+        for field, kind in (('checked_out', 'gauge'), ('overflow', 'gauge'), ('checkouts', 'counter'),
+                            ('timeouts', 'counter'), ('checkout_seconds_total', 'counter')):
+            name = f'podcastmarket_db_pool_{field}'
+            lines.append(f'# TYPE {name} {kind}')
+            for bind, data in sorted(pools.items()):
+                if field in data:
+                    lines.append(f'{name}{_labels((("bind", bind),))} {data[field]}')
+        return '\n'.join(lines) + '\n'
+
+request_metrics = RequestMetrics()
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _sql_started(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and '_request_sample' in g:
+        conn.info.setdefault('_sql_started', []).append(time.perf_counter())
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _sql_finished(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('_sql_started')
+    if started and has_request_context() and '_request_sample' in g:
+        sample = g._request_sample
+        sample['sql_count'] += 1
+        sample['sql_time'] += time.perf_counter() - started.pop()
+
+@event.listens_for(Engine, 'handle_error')
+def _sql_failed(context):
+    started = context.connection.info.get('_sql_started') if context.connection is not None else None
+    if started:
+        started.pop()
+
+def _template_started(sender, template, context, **extra):
+    if '_request_sample' in g:
+        g._request_sample['template_started'].append(time.perf_counter())
+
+def _template_finished(sender, template, context, **extra):
+    if '_request_sample' in g and g._request_sample['template_started']:
+        sample = g._request_sample
+        sample['template_time'] += time.perf_counter() - sample['template_started'].pop()
+
+def _start_profiler(app):
+    """A running profiler for a sampled request, or None"""
+    if random.random() >= app.config['PROFILE_SAMPLE_RATE']:
+        return None
+    if app.config['PROFILER'] == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            app.logger.warning('PROFILER=pyinstrument but pyinstrument is not installed, using cProfile')
+        else:
+            profiler = Profiler()
+            profiler.start()
+            return profiler
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another thread is already being profiled (a single profiler may
+        # run at a time on Python 3.12+)
+        return None
+    return profiler
+
+def _dump_profile(app, profiler, endpoint, wall):
+    """Stop the profiler and keep its output when the request was slow"""
+    if isinstance(profiler, cProfile.Profile):
+        profiler.disable()
+    else:
+        profiler.stop()
+    if wall * 1000 < app.config['PROFILE_SLOW_REQUEST_MS']:
+        return
+
+    os.makedirs(app.config['PROFILE_DIR'], exist_ok=True)
+    name = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{endpoint}-{int(wall * 1000)}ms-{os.getpid()}"
+    path = os.path.join(app.config['PROFILE_DIR'], name)
+    if isinstance(profiler, cProfile.Profile):
+        path += '.prof'
+        profiler.dump_stats(path)
+    else:
+        path += '.html'
+        with open(path, 'w') as f:
+            f.write(profiler.output_html())
+    app.logger.warning('Slow request %s %s took %d ms, profile saved to %s', request.method, request.path, wall * 1000, path)
+
+def _metrics_allowed(app):
+    """Whether the request may read /metrics (None when the endpoint is off)"""
+    token = app.config.get('METRICS_TOKEN')
+    allowed_ips = app.config.get('METRICS_ALLOWED_IPS') or ()
+    if not token and not allowed_ips:
+        return None
+    if request.remote_addr in allowed_ips:
+        return True
+    scheme, _, credentials = request.headers.get('Authorization', '').partition(' ')
+    return bool(token) and scheme.lower() == 'bearer' and hmac.compare_digest(credentials.encode(), token.encode())
+
+def init_instrumentation(app):
+    """Measure every request and serve the numbers at /metrics to authorized scrapers
+
+    Per endpoint: wall time, SQL statement count and time, template render
+    time and response size. With PROFILE_SLOW_REQUEST_MS set, a sample of
+    requests (PROFILE_SAMPLE_RATE) runs under cProfile (or pyinstrument) and
+    the profile of those slower than the threshold is written to PROFILE_DIR.
+    """
+    if not app.config.get('METRICS_ENABLED'):
+        return
+
+    before_render_template.connect(_template_started, app)
+    template_rendered.connect(_template_finished, app)
+
+    @app.before_request
+    def start_request_sample():
+        g._request_sample = {
+            'start': time.perf_counter(),
+            'sql_count': 0,
+            'sql_time': 0.0,
+            'template_time': 0.0,
+            'template_started': [],
+        }
+        if app.config.get('PROFILE_SLOW_REQUEST_MS') is not None:
+            g._request_profiler = _start_profiler(app)
+
+    @app.after_request
+    def record_request_sample(response):
+        sample = g.pop('_request_sample', None)
+        if sample is None:
+            return response
+        sample['wall'] = time.perf_counter() - sample['start']
+        endpoint = request.endpoint or 'unmatched'
+        size = None if response.is_streamed else response.calculate_content_length()
+        request_metrics.record(endpoint, request.method, response.status_code, sample, size)
+
+        profiler = g.pop('_request_profiler', None)
+        if profiler is not None:
+            _dump_profile(app, profiler, endpoint, sample['wall'])
+        return response
+
+    @app.teardown_request
+    def stop_request_profiler(exc):
+        # after_request is skipped when the view raised
+        profiler = g.pop('_request_profiler', None)
+        if isinstance(profiler, cProfile.Profile):
+            profiler.disable()
+        elif profiler is not None:
+            profiler.stop()
+
+    @app.route('/metrics')
+    def metrics():
+        """Prometheus metrics of this worker process, for authorized scrapers"""
+        allowed = _metrics_allowed(app)
+        if allowed is None:
+            abort(404)
+        if not allowed:
+            abort(403)
+        from app import db
+        return Response(request_metrics.expose(db), mimetype='text/plain; version=0.0.4')
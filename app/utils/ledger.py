@@ -0,0 +1,180 @@
+from collections import Counter
+from datetime import datetime, time
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import aliased
+from app import db
+from app.models import Brand, BrandMonthlySpend, Campaign, SpendEntry
+from app.utils.rollups import upsert_increments
+
+def month_of(moment):
+    """First day of the month of a date or datetime"""
+    day = moment.date() if isinstance(moment, datetime) else moment
+    return day.replace(day=1)
+
+def _restate_balances(brand_id, since, balance):
+    """Recompute a brand's month-end balances from ``since`` on, given its current balance"""
+    later = aliased(BrandMonthlySpend)
+    spent_after = select(func.coalesce(func.sum(later.spent), 0.0)).where(
+        later.brand_id == BrandMonthlySpend.brand_id, later.month > BrandMonthlySpend.month
+    ).scalar_subquery()
+    db.session.execute(
+        update(BrandMonthlySpend)
+        .where(BrandMonthlySpend.brand_id == brand_id, BrandMonthlySpend.month >= since)
+        .values(balance=balance - spent_after)
+        .execution_options(synchronize_session=False)
+    )
+
+def record_spends(campaign, kind, spends):
+    """Append spend entries for ``campaign`` and move its brand's running balance
+
+    ``spends`` are (amount, episodes, at) tuples; ``at`` None means now. Runs
+    in the caller's transaction. The balance is incremented in SQL, once for
+    all the entries, and read back with RETURNING, so each entry's balance is
+    exact even with concurrent writers (the brand row stays locked until
+    commit); the BrandMonthlySpend row of each month is upserted alongside.
+    Entries dated in an earlier month also restate the month-end balances
+    that follow them.
+    """
+    spends = [(amount, episodes, at) for amount, episodes, at in spends if amount]
+    if not spends:
+        return []
+    if campaign.id is None:
+        db.session.flush()
+    total = sum(amount for amount, _, _ in spends)
+    balance = db.session.execute(
+        update(Brand).where(Brand.id == campaign.brand_id)
+        .values(total_spent=func.coalesce(Brand.total_spent, 0) + total, updated_at=Brand.updated_at)
+        .returning(Brand.total_spent)
+        .execution_options(synchronize_session=False)
+    ).scalar_one()
+
+    now = datetime.utcnow()
+    running = balance - total
+    entries, months = [], {}
+    for amount, episodes, at in spends:
+        running += amount
+        at = at or now
+        entries.append(SpendEntry(
+            brand_id=campaign.brand_id,
+            campaign_id=campaign.id,
+            kind=kind,
+            amount=amount,
+            episodes=episodes,
+            rate=campaign.negotiated_rate,
+            balance=running,
+            month=month_of(at),
+            created_at=at
+        ))
+        spent, count = months.get(month_of(at), (0, 0))
+        months[month_of(at)] = (spent + amount, count + 1)
+    db.session.add_all(entries)
+
+    for month, (spent, count) in sorted(months.items()):
+        upsert_increments(
+            BrandMonthlySpend, {'brand_id': campaign.brand_id, 'month': month},
+            {'spent': spent, 'entries': count}, assign={'balance': balance}
+        )
+    if min(months) < month_of(now):
+        _restate_balances(campaign.brand_id, min(months), balance)
+    return entries
+
+def record_spend(campaign, kind, amount, episodes=0, at=None):
+    """Append one spend entry for ``campaign``, see ``record_spends``"""
+    entries = record_spends(campaign, kind, [(amount, episodes, at)])
+    return entries[0] if entries else None
+
+def record_campaign_spend(campaign, previous_rate, previous_episodes, delivered_on=()):
+    """Ledger entries for a change of a campaign's negotiated rate or delivered episodes
+
+    Newly delivered episodes are charged at the current rate, one entry per
+    delivery day when ``delivered_on`` gives the episodes' tracked dates (so
+    backfilled episodes are charged to the month they ran), otherwise now.
+    A rate change re-prices the episodes that were already delivered.
+    """
+    rate = campaign.negotiated_rate or 0
+    episodes = campaign.episodes_completed or 0
+    previous_episodes = previous_episodes or 0
+    delivered = episodes - previous_episodes
+    today = datetime.utcnow().date()
+    days = Counter(
+        day.date() if isinstance(day, datetime) else day
+        for day in list(delivered_on)[:max(delivered, 0)] if day is not None
+    )
+    deliveries = [
+        (rate * count, count, None if day == today else datetime.combine(day, time()))
+        for day, count in sorted(days.items())
+    ]
+    undated = delivered - sum(days.values())
+    record_spends(campaign, 'delivery', deliveries + [(rate * undated, undated, None)])
+    record_spend(campaign, 'renegotiation', (rate - (previous_rate or 0)) * previous_episodes)
+
+def rebuild_spend_snapshots():
+    """Recompute every BrandMonthlySpend row from the spend ledger"""
+    db.session.execute(delete(BrandMonthlySpend))
+    rows = db.session.execute(
+        select(SpendEntry.brand_id, SpendEntry.month, func.sum(SpendEntry.amount), func.count(SpendEntry.id))
+        .group_by(SpendEntry.brand_id, SpendEntry.month)
+        .order_by(SpendEntry.brand_id, SpendEntry.month)
+    )
+    snapshots = []
+    balances = {}
+    for brand_id, month, spent, entries in rows:
+        balances[brand_id] = balances.get(brand_id, 0) + spent
+        snapshots.append({
+            'brand_id': brand_id, 'month': month, 'spent': spent,
+            'entries': entries, 'balance': balances[brand_id]
+        })
+    if snapshots:
+        db.session.execute(insert(BrandMonthlySpend), snapshots)
+
+def reconcile_spend(fix=True):
+    """Check the spend ledger against the campaigns and the brand balances
+
+    A campaign whose entries don't add up to negotiated rate x episodes
+    completed gets an 'adjustment' entry for the difference (entries are
+    never edited); brand balances are reset to the sum of their entries and
+    the monthly snapshots rebuilt. Returns ({name: drifted row count}, ids of
+    the users owning a drifted brand). Nothing is written if ``fix`` is false.
+    """
+    delivered = func.coalesce(Campaign.negotiated_rate * Campaign.episodes_completed, 0.0)
+    charged = select(
+        SpendEntry.campaign_id, func.sum(SpendEntry.amount).label('amount')
+    ).group_by(SpendEntry.campaign_id).subquery()
+    gap = delivered - func.coalesce(charged.c.amount, 0.0)
+    gaps = db.session.execute(
+        select(Campaign.id, Campaign.brand_id, Campaign.negotiated_rate, gap)
+        .outerjoin(charged, charged.c.campaign_id == Campaign.id)
+        .where(func.abs(gap) > 0.005)
+        .order_by(Campaign.brand_id, Campaign.id)
+    ).all()
+
+    ledger = dict(db.session.execute(
+        select(SpendEntry.brand_id, func.sum(SpendEntry.amount)).group_by(SpendEntry.brand_id)
+    ).all())
+    balances = dict(ledger)
+    now = datetime.utcnow()
+    adjustments = []
+    for campaign_id, brand_id, rate, amount in gaps:
+        balances[brand_id] = balances.get(brand_id, 0) + amount
+        adjustments.append({
+            'brand_id': brand_id, 'campaign_id': campaign_id, 'kind': 'adjustment',
+            'amount': amount, 'episodes': 0, 'rate': rate, 'balance': balances[brand_id],
+            'month': month_of(now), 'created_at': now
+        })
+
+    drifted_brands = 0
+    updates, owners = [], set()
+    for brand_id, user_id, stored in db.session.execute(select(Brand.id, Brand.user_id, Brand.total_spent)):
+        if abs((stored or 0) - ledger.get(brand_id, 0)) > 0.005:
+            drifted_brands += 1
+        if abs((stored or 0) - balances.get(brand_id, 0)) > 0.005:
+            updates.append({'id': brand_id, 'total_spent': balances.get(brand_id, 0)})
+            owners.add(user_id)
+
+    if fix:
+        if adjustments:
+            db.session.execute(insert(SpendEntry), adjustments)
+        if updates:
+            db.session.execute(update(Brand), updates)
+        rebuild_spend_snapshots()
+    return {'spend_ledger': len(gaps), 'brands.total_spent': drifted_brands}, owners
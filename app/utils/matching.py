@@ -0,0 +1,220 @@
+import math
+import threading
+import time
+import numpy as np
+from flask import current_app
+from sqlalchemy import func, select
+from app import db
+from app.models import Podcast
+from app.utils.demographics import DIMENSION_ALIASES, demographic_shares, load_json
+
+COMPONENTS = ('category', 'demographics', 'audience', 'rate')
+
+class PodcastMatcher:
+    """Brand-to-podcast scoring over an in-memory feature matrix
+
+    Each process keeps one row per podcast: category code, audience, rate
+    range, eligibility and the demographic shares as columns of a float32
+    matrix. The matrix is loaded on first use and then kept current
+    incrementally: every refresh reloads the rows updated since the last sync
+    (an indexed updated_at range, usually empty), whichever process made the
+    change. It is rebuilt from scratch every MATCHING_MAX_AGE seconds to
+    compact deleted rows and pick up writes that didn't touch updated_at.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.built_at = None
+        self.watermark = None
+        self._reset()
+
+    def _reset(self):
+        self.rows = {}
+        self.categories = {}
+        self.segments = {}
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.category = np.zeros(0, dtype=np.int32)
+        self.listeners = np.zeros(0)
+        self.min_rate = np.zeros(0)
+        self.max_rate = np.zeros(0)
+        self.eligible = np.zeros(0, dtype=bool)
+        self.demographics = np.zeros((0, 0), dtype=np.float32)
+
+    def _query(self):
+        return select(
+            Podcast.id, Podcast.category, Podcast.average_listeners, Podcast.min_rate,
+            Podcast.max_rate, Podcast.is_active, Podcast.is_accepting_ads,
+            Podcast.audience_demographics, Podcast.updated_at
+        )
+
+    def _grow(self, rows, columns):
+        """Make room for ``rows`` more podcasts and ``columns`` more segments"""
+        if rows:
+            self.ids = np.concatenate([self.ids, np.full(rows, -1, dtype=np.int64)])
+            self.category = np.concatenate([self.category, np.full(rows, -1, dtype=np.int32)])
+            self.listeners = np.concatenate([self.listeners, np.zeros(rows)])
+            self.min_rate = np.concatenate([self.min_rate, np.full(rows, np.nan)])
+            self.max_rate = np.concatenate([self.max_rate, np.full(rows, np.nan)])
+            self.eligible = np.concatenate([self.eligible, np.zeros(rows, dtype=bool)])
+        if rows or columns:
+            self.demographics = np.pad(self.demographics, ((0, rows), (0, columns)))
+
+    def _write(self, records):
+        """Insert or overwrite the feature rows of ``records`` in one pass"""
+        if not records:
+            return
+        (ids, categories, listeners, min_rates, max_rates,
+         active, accepting, demographics, updated) = zip(*records)
+        new = [podcast_id for podcast_id in ids if podcast_id not in self.rows]
+        for offset, podcast_id in enumerate(new, start=len(self.ids)):
+            self.rows[podcast_id] = offset
+        index = np.array([self.rows[podcast_id] for podcast_id in ids])
+
+        # Raw weights are collected cell by cell and normalized per dimension
+        # below, with whole-column operations
+        segments = self.segments
+        known_segments = len(segments)
+        rows, columns, weights = [], [], []
+        for row, value in zip(index.tolist(), demographics):
+            data = load_json(value)
+            if not isinstance(data, dict):
+                continue
+            for dimension, values in data.items():
+                dimension = DIMENSION_ALIASES.get(dimension, dimension)
+                if isinstance(values, list):
+                    values = dict.fromkeys(values, 1)
+                elif not isinstance(values, dict):
+                    continue
+                for segment, weight in values.items():
+                    if not isinstance(weight, (int, float)) or weight <= 0:
+                        continue
+                    key = (dimension, str(segment))
+                    column = segments.get(key)
+                    if column is None:
+                        column = segments[key] = len(segments)
+                    rows.append(row)
+                    columns.append(column)
+                    weights.append(weight)
+        self._grow(len(new), len(segments) - known_segments)
+
+        self.ids[index] = ids
+        self.category[index] = [self.categories.setdefault(category, len(self.categories))
+                                if category else -1 for category in categories]
+        # dtype=float turns NULLs into NaN
+        self.listeners[index] = np.nan_to_num(np.array(listeners, dtype=float))
+        self.min_rate[index] = np.array(min_rates, dtype=float)
+        self.max_rate[index] = np.array(max_rates, dtype=float)
+        self.eligible[index] = np.array(active, dtype=bool) & np.array(accepting, dtype=bool)
+
+        self.demographics[index] = 0
+        self.demographics[rows, columns] = weights
+        for dimension_columns in self._dimensions().values():
+            block = self.demographics[np.ix_(index, dimension_columns)]
+            totals = block.sum(axis=1, keepdims=True)
+            self.demographics[np.ix_(index, dimension_columns)] = np.divide(
+                block, totals, out=np.zeros_like(block), where=totals > 0
+            )
+
+        latest = max(filter(None, updated), default=None)
+        if latest and (self.watermark is None or latest > self.watermark):
+            self.watermark = latest
+
+    def _dimensions(self):
+        """Matrix columns of each demographic dimension"""
+        dimensions = {}
+        for (dimension, _), column in self.segments.items():
+            dimensions.setdefault(dimension, []).append(column)
+        return dimensions
+
+    def _remove(self, podcast_ids):
+        # Rows are tombstoned in place; the next rebuild compacts them
+        for podcast_id in podcast_ids:
+            row = self.rows.pop(podcast_id)
+            self.ids[row] = -1
+            self.eligible[row] = False
+
+    def rebuild(self):
+        self._reset()
+        self.watermark = None
+        self._write(db.session.execute(self._query()).all())
+        self.built_at = time.monotonic()
+
+    def sync(self):
+        """Reload the podcasts updated since the last sync and drop the deleted ones"""
+        query = self._query()
+        if self.watermark is not None:
+            # >= : rows sharing the watermark's timestamp may have been missed
+            query = query.where(Podcast.updated_at >= self.watermark)
+        self._write(db.session.execute(query).all())
+        # Only look for deleted rows when the counts disagree
+        if db.session.scalar(select(func.count(Podcast.id))) != len(self.rows):
+            existing = np.array(db.session.scalars(select(Podcast.id)).all(), dtype=np.int64)
+            self._remove(np.setdiff1d(self.ids[self.ids >= 0], existing).tolist())
+
+    def refresh(self):
+        """Bring the matrix up to date with the database"""
+        with self.lock:
+            if self.built_at is None or time.monotonic() - self.built_at > current_app.config['MATCHING_MAX_AGE']:
+                self.rebuild()
+            else:
+                self.sync()
+
+    def scores(self, brand):
+        """Per-component and weighted scores of every podcast for ``brand``"""
+        count = len(self.ids)
+        components = {}
+
+        preferred = load_json(brand.preferred_categories, []) or []
+        if isinstance(preferred, str):
+            preferred = [preferred]
+        codes = [self.categories[c] for c in preferred if c in self.categories]
+        components['category'] = np.isin(self.category, codes).astype(float) if codes else np.zeros(count)
+
+        # Histogram intersection per dimension, averaged over the brand's dimensions
+        target = demographic_shares(brand.target_demographics)
+        known = [(self.segments[key], share) for key, share in target.items() if key in self.segments]
+        if known:
+            columns, shares = zip(*known)
+            overlap = np.minimum(self.demographics[:, list(columns)], np.array(shares, dtype=np.float32)).sum(axis=1)
+            components['demographics'] = overlap / len({dimension for dimension, _ in target})
+        else:
+            components['demographics'] = np.zeros(count)
+
+        # Log scale, so the largest shows don't flatten everybody else
+        largest = self.listeners.max() if count else 0
+        components['audience'] = np.log1p(self.listeners) / math.log1p(largest) if largest > 0 else np.zeros(count)
+
+        # 1 when the budget covers the top of the rate range, 0 below its bottom
+        low = np.where(np.isnan(self.min_rate), self.max_rate, self.min_rate)
+        high = np.where(np.isnan(self.max_rate), low, self.max_rate)
+        budget = brand.monthly_budget
+        if budget:
+            span = high - low
+            with np.errstate(divide='ignore', invalid='ignore'):
+                fit = np.where(span > 0, np.clip((budget - low) / span, 0, 1), (budget >= low).astype(float))
+            components['rate'] = np.where(np.isnan(low), 0.5, fit)
+        else:
+            components['rate'] = np.full(count, 0.5)
+
+        weights = current_app.config['MATCHING_WEIGHTS']
+        total = sum(weights[name] * components[name] for name in COMPONENTS)
+        return np.where(self.eligible, total, -np.inf), components
+
+    def recommend(self, brand, limit=20):
+        """The ``limit`` best podcasts for ``brand`` as (podcast id, score, components)"""
+        self.refresh()
+        with self.lock:
+            total, components = self.scores(brand)
+            ids = self.ids
+        k = min(limit, int(np.isfinite(total).sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(-total, k - 1)[:k]
+        top = top[np.argsort(-total[top], kind='stable')]
+        return [
+            (int(ids[row]), round(float(total[row]), 4),
+             {name: round(float(components[name][row]), 4) for name in COMPONENTS})
+            for row in top
+        ]
+
+podcast_matcher = PodcastMatcher()
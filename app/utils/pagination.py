@@ -0,0 +1,106 @@
+import base64
+import json
+from datetime import date, datetime
+from flask import current_app, request
+from sqlalchemy import and_, or_, desc
+
+MAX_PER_PAGE = 100
+
+class KeysetPage:
+    """One page of a keyset-paginated query"""
+    
+    def __init__(self, items, next_cursor, per_page):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.per_page = per_page
+    
+    @property
+    def has_more(self):
+        return self.next_cursor is not None
+    
+    def to_dict(self):
+        """Pagination metadata for JSON responses"""
+        return {
+            'next_cursor': self.next_cursor,
+            'has_more': self.has_more,
+            'per_page': self.per_page
+        }
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f'Cannot encode {type(value).__name__} in a cursor')
+
+def _coerce(column, value):
+    """Turn a decoded cursor value back into the column's Python type"""
+    if not isinstance(value, str):
+        return value
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return value
+
+def encode_cursor(values):
+    """Encode the sort key of the last row as an opaque URL-safe cursor"""
+    raw = json.dumps(list(values), separators=(',', ':'), default=_json_default).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor, size):
+    """Decode a cursor, returning None when it is missing or malformed"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(values, list) or len(values) != size:
+        return None
+    return values
+
+def get_per_page():
+    """Read per_page from the query string, bounded by MAX_PER_PAGE"""
+    default = current_app.config.get('ITEMS_PER_PAGE', 20)
+    per_page = request.args.get('per_page', default, type=int)
+    return max(1, min(per_page or default, MAX_PER_PAGE))
+
+def keyset_paginate(query, columns, cursor=None, per_page=None):
+    """Paginate a query ordered by ``columns`` (all descending) with a keyset cursor
+    
+    The last column must be unique (usually the primary key) so that the
+    ordering is total. Rows after the cursor are selected with a seek
+    predicate instead of OFFSET, so deep pages cost the same as the first.
+    """
+    per_page = per_page or get_per_page()
+    values = decode_cursor(cursor, len(columns))
+    
+    if values is not None:
+        try:
+            values = [_coerce(c, v) for c, v in zip(columns, values)]
+        except ValueError:
+            values = None
+    
+    if values is not None:
+        # (a, b, c) < (va, vb, vc) expanded for backends without row values
+        clauses = []
+        for i, column in enumerate(columns):
+            equal = [columns[j] == values[j] for j in range(i)]
+            clauses.append(and_(*equal, column < values[i]))
+        query = query.filter(or_(*clauses))
+    
+    # Select the sort key alongside each row so the cursor can be built from
+    # computed columns (e.g. a search rank) as well as mapped attributes
+    keys = [c.label(f'_keyset_{i}') for i, c in enumerate(columns)]
+    rows = query.add_columns(*keys).order_by(*[desc(c) for c in columns]).limit(per_page + 1).all()
+    
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor(rows[-1][1:])
+    
+    return KeysetPage([row[0] for row in rows], next_cursor, per_page)
@@ -0,0 +1,37 @@
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+class TooManyQueries(AssertionError):
+    """A request issued more SQL statements than SQL_QUERY_LIMIT allows"""
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'sql_query_count' in g:
+        g.sql_query_count += 1
+
+def init_query_counter(app):
+    """Count SQL statements per request and report requests above SQL_QUERY_LIMIT
+
+    Meant for development and tests: it logs a warning naming the endpoint (or
+    raises TooManyQueries when SQL_QUERY_LIMIT_FAIL is set) so N+1 patterns
+    show up as soon as they are introduced.
+    """
+    limit = app.config.get('SQL_QUERY_LIMIT')
+    if not limit:
+        return
+
+    @app.before_request
+    def start_query_count():
+        g.sql_query_count = 0
+
+    @app.after_request
+    def check_query_count(response):
+        count = g.pop('sql_query_count', 0)
+        response.headers['X-SQL-Queries'] = str(count)
+        if count > limit:
+            message = f'{request.method} {request.path} ({request.endpoint}) issued {count} SQL statements, limit is {limit}'
+            if app.config.get('SQL_QUERY_LIMIT_FAIL'):
+                raise TooManyQueries(message)
+            app.logger.warning(message)
+        return response
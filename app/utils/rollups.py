@@ -0,0 +1,95 @@
+from datetime import datetime
+from sqlalchemy import func, select, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+from app.models import AdPerformance, Campaign, CampaignDailyStats, PodcastDailyStats, BrandDailyStats
+
+METRICS = CampaignDailyStats.METRICS
+
+# Rollup model -> Campaign column it is keyed by
+SCOPES = (
+    (CampaignDailyStats, Campaign.id),
+    (PodcastDailyStats, Campaign.podcast_id),
+    (BrandDailyStats, Campaign.brand_id),
+)
+
+def _day(value):
+    return value.date() if isinstance(value, datetime) else value
+
+def upsert_increments(model, keys, increments, assign=None):
+    """Add ``increments`` to the row identified by ``keys``, creating it if needed
+
+    Columns in ``assign`` are overwritten rather than added to.
+    """
+    dialect = db.session.get_bind().dialect.name
+    assign = assign or {}
+    values = dict(keys, **increments, **assign)
+
+    if dialect in ('sqlite', 'postgresql'):
+        dialect_insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+        statement = dialect_insert(model).values(**values)
+        set_ = {
+            metric: getattr(model, metric) + getattr(statement.excluded, metric)
+            for metric in increments
+        }
+        set_.update({name: getattr(statement.excluded, name) for name in assign})
+        statement = statement.on_conflict_do_update(index_elements=list(keys), set_=set_)
+        db.session.execute(statement)
+        return
+
+    row = db.session.get(model, keys)
+    if row is None:
+        db.session.add(model(**values))
+    else:
+        for metric, amount in increments.items():
+            setattr(row, metric, getattr(row, metric) + amount)
+        for name, value in assign.items():
+            setattr(row, name, value)
+
+def _value(record, name):
+    return record.get(name) if isinstance(record, dict) else getattr(record, name)
+
+def record_performance(campaign, records):
+    """Fold new AdPerformance rows of one campaign into the daily rollups
+
+    ``records`` are AdPerformance instances or dicts of their column values.
+    Runs in the caller's transaction, so the rollups commit (or roll back)
+    together with the raw rows.
+    """
+    by_day = {}
+    for record in records:
+        tracked_date = _value(record, 'tracked_date')
+        if tracked_date is None:
+            continue
+        totals = by_day.setdefault(_day(tracked_date), dict.fromkeys(METRICS + ('records',), 0))
+        for metric in METRICS:
+            totals[metric] += _value(record, metric) or 0
+        totals['records'] += 1
+
+    scope_ids = {
+        CampaignDailyStats: {'campaign_id': campaign.id},
+        PodcastDailyStats: {'podcast_id': campaign.podcast_id},
+        BrandDailyStats: {'brand_id': campaign.brand_id},
+    }
+    for day, totals in by_day.items():
+        for model, keys in scope_ids.items():
+            upsert_increments(model, dict(keys, day=day), totals)
+
+def rebuild_rollups():
+    """Recompute every rollup table from the raw ad_performance rows"""
+    for model, scope_column in SCOPES:
+        key = model.__table__.primary_key.columns.keys()[0]
+        db.session.execute(model.__table__.delete())
+        aggregate = select(
+            scope_column,
+            AdPerformance.tracked_date,
+            *[func.coalesce(func.sum(getattr(AdPerformance, m)), 0) for m in METRICS],
+            func.count(AdPerformance.id)
+        ).select_from(AdPerformance).join(
+            Campaign, Campaign.id == AdPerformance.campaign_id
+        ).where(
+            AdPerformance.tracked_date.isnot(None)
+        ).group_by(scope_column, AdPerformance.tracked_date)
+        db.session.execute(
+            insert(model).from_select([key, 'day', *METRICS, 'records'], aggregate)
+        )
@@ -0,0 +1,232 @@
+import re
+from flask import current_app
+from sqlalchemy import event, text, select, func, literal, literal_column, Float, Integer, or_
+from sqlalchemy.engine import make_url
+from app import db
+
+# Weight of each indexed column in the ranking, in declaration order
+INDEXED_FIELDS = {
+    'podcasts': (('title', 10.0), ('description', 1.0)),
+    'brands': (('name', 10.0), ('industry', 5.0), ('description', 1.0)),
+}
+
+def tokenize(query_text):
+    """Split free text into search terms"""
+    return re.findall(r'\w+', query_text or '', re.UNICODE)
+
+class LikeBackend:
+    """Fallback backend using ILIKE scans, for databases without full-text support"""
+    name = 'like'
+
+    def create_indexes(self, connection):
+        pass
+
+    def drop_indexes(self, connection):
+        pass
+
+    def rebuild(self, table):
+        pass
+
+    def index(self, table, row):
+        pass
+
+    def remove(self, table, row_id):
+        pass
+
+    def hits(self, table, terms):
+        model_table = db.metadata.tables[table]
+        clauses = []
+        for term in terms:
+            clauses.append(or_(*[
+                model_table.c[field].ilike(f'%{term}%')
+                for field, _ in INDEXED_FIELDS[table]
+            ]))
+        return select(
+            model_table.c.id.label('id'),
+            literal(0.0).label('score')
+        ).where(*clauses).subquery('search_hits')
+
+class SQLiteFTSBackend:
+    """SQLite FTS5 backend, one contentless-rowid virtual table per model table"""
+    name = 'sqlite'
+
+    @staticmethod
+    def _index_table(table):
+        return f'{table}_search'
+
+    def _columns(self, table):
+        return [field for field, _ in INDEXED_FIELDS[table]]
+
+    def create_indexes(self, connection):
+        for table in INDEXED_FIELDS:
+            index_table = self._index_table(table)
+            exists = connection.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {'name': index_table}
+            ).first()
+            if exists:
+                continue
+            columns = ', '.join(self._columns(table))
+            connection.execute(text(
+                f"CREATE VIRTUAL TABLE {index_table} USING fts5("
+                f"{columns}, tokenize='unicode61 remove_diacritics 2')"
+            ))
+            self._populate(connection, table)
+
+    def drop_indexes(self, connection):
+        for table in INDEXED_FIELDS:
+            connection.execute(text(f'DROP TABLE IF EXISTS {self._index_table(table)}'))
+
+    def _populate(self, connection, table):
+        columns = ', '.join(self._columns(table))
+        connection.execute(text(
+            f'INSERT INTO {self._index_table(table)}(rowid, {columns}) '
+            f'SELECT id, {columns} FROM {table}'
+        ))
+
+    def rebuild(self, table):
+        connection = db.session.connection()
+        connection.execute(text(f'DELETE FROM {self._index_table(table)}'))
+        self._populate(connection, table)
+
+    def index(self, table, row):
+        columns = self._columns(table)
+        self.remove(table, row.id)
+        db.session.execute(
+            text(
+                f"INSERT INTO {self._index_table(table)}(rowid, {', '.join(columns)}) "
+                f"VALUES (:id, {', '.join(':' + c for c in columns)})"
+            ),
+            dict({'id': row.id}, **{c: getattr(row, c) for c in columns})
+        )
+
+    def remove(self, table, row_id):
+        db.session.execute(
+            text(f'DELETE FROM {self._index_table(table)} WHERE rowid = :id'),
+            {'id': row_id}
+        )
+
+    def hits(self, table, terms):
+        index_table = self._index_table(table)
+        weights = ', '.join(str(weight) for _, weight in INDEXED_FIELDS[table])
+        # Quote each term so FTS5 operators in user input are matched literally
+        match = ' '.join('"{}"*'.format(term.replace('"', '')) for term in terms)
+        return text(
+            f'SELECT rowid AS id, -bm25({index_table}, {weights}) AS score '
+            f'FROM {index_table} WHERE {index_table} MATCH :match'
+        ).bindparams(match=match).columns(id=Integer, score=Float).subquery('search_hits')
+
+class PostgresSearchBackend:
+    """PostgreSQL backend using GIN indexes over a tsvector expression"""
+    name = 'postgresql'
+
+    def __init__(self, ts_config='simple'):
+        self.ts_config = ts_config
+
+    def _vector_sql(self, table):
+        parts = [
+            f"setweight(to_tsvector('{self.ts_config}', coalesce({field}, '')), '{label}')"
+            for (field, _), label in zip(INDEXED_FIELDS[table], 'ABCD')
+        ]
+        return ' || '.join(parts)
+
+    def create_indexes(self, connection):
+        for table in INDEXED_FIELDS:
+            connection.execute(text(
+                f'CREATE INDEX IF NOT EXISTS ix_{table}_search '
+                f'ON {table} USING gin (({self._vector_sql(table)}))'
+            ))
+
+    def drop_indexes(self, connection):
+        for table in INDEXED_FIELDS:
+            connection.execute(text(f'DROP INDEX IF EXISTS ix_{table}_search'))
+
+    # The expression index is maintained by PostgreSQL itself
+    def rebuild(self, table):
+        pass
+
+    def index(self, table, row):
+        pass
+
+    def remove(self, table, row_id):
+        pass
+
+    def hits(self, table, terms):
+        model_table = db.metadata.tables[table]
+        tsquery = func.to_tsquery(
+            self.ts_config,
+            ' & '.join(f'{term}:*' for term in terms)
+        )
+        # Spelled exactly like the indexed expression so the planner can use it
+        vector = literal_column(self._vector_sql(table))
+        return select(
+            model_table.c.id.label('id'),
+            func.ts_rank(vector, tsquery).label('score')
+        ).select_from(model_table).where(vector.op('@@')(tsquery)).subquery('search_hits')
+
+BACKENDS = {
+    'like': LikeBackend,
+    'sqlite': SQLiteFTSBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+class SearchIndex:
+    """Full-text search over podcasts and brands with a pluggable backend"""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('SEARCH_BACKEND', 'auto')
+        name = app.config['SEARCH_BACKEND']
+        if name == 'auto':
+            name = make_url(app.config['SQLALCHEMY_DATABASE_URI']).get_backend_name()
+        app.extensions['search_index'] = BACKENDS.get(name, LikeBackend)()
+
+    @property
+    def backend(self):
+        return current_app.extensions['search_index']
+
+    def create_indexes(self, connection):
+        self.backend.create_indexes(connection)
+
+    def drop_indexes(self, connection):
+        self.backend.drop_indexes(connection)
+
+    def rebuild(self):
+        """Repopulate every index from its base table"""
+        for table in INDEXED_FIELDS:
+            self.backend.rebuild(table)
+
+    def index_podcast(self, podcast):
+        self.backend.index('podcasts', podcast)
+
+    def remove_podcast(self, podcast_id):
+        self.backend.remove('podcasts', podcast_id)
+
+    def index_brand(self, brand):
+        self.backend.index('brands', brand)
+
+    def remove_brand(self, brand_id):
+        self.backend.remove('brands', brand_id)
+
+    def podcast_hits(self, query_text):
+        """Subquery of (id, score) for matching podcasts, or None when there is nothing to search"""
+        terms = tokenize(query_text)
+        return self.backend.hits('podcasts', terms) if terms else None
+
+    def brand_hits(self, query_text):
+        """Subquery of (id, score) for matching brands, or None when there is nothing to search"""
+        terms = tokenize(query_text)
+        return self.backend.hits('brands', terms) if terms else None
+
+search_index = SearchIndex()
+
+@event.listens_for(db.metadata, 'after_create')
+def _create_search_indexes(target, connection, **kw):
+    search_index.create_indexes(connection)
+
+@event.listens_for(db.metadata, 'before_drop')
+def _drop_search_indexes(target, connection, **kw):
+    search_index.drop_indexes(connection)
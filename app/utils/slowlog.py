@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+import click
+from flask import has_request_context, request
+from sqlalchemy import event
+
+# Expanded IN lists render one placeholder per value; collapse them so the
+# same query groups together whatever the list length
+_PLACEHOLDER_LIST = re.compile(r'\((?:\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*,)+\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*\)')
+_ROW_LIST = re.compile(r'\(\?, \.\.\.\)(?:, \(\?, \.\.\.\))+')
+_SPACES = re.compile(r'\s+')
+
+def normalize(statement):
+    """The statement with whitespace, IN-list and VALUES-list lengths normalized"""
+    statement = _PLACEHOLDER_LIST.sub('(?, ...)', _SPACES.sub(' ', statement).strip())
+    return _ROW_LIST.sub('(?, ...), ...', statement)
+
+def _is_many(parameters, executemany):
+    # Batched INSERT ... VALUES (...), (...) runs with executemany set but a
+    # single flat parameter tuple
+    if not executemany or not parameters:
+        return False
+    first = parameters[0] if isinstance(parameters, (list, tuple)) else None
+    return isinstance(first, (list, tuple, dict))
+
+def fingerprint(statement):
+    return hashlib.sha1(statement.encode('utf-8')).hexdigest()[:12]
+
+def _type_name(value):
+    return 'NULL' if value is None else type(value).__name__
+
+def parameter_shape(parameters, executemany=False):
+    """The types of the bound parameters, without their values"""
+    if executemany:
+        rows = list(parameters or ())
+        return f'{len(rows)} x {parameter_shape(rows[0]) if rows else "()"}'
+    if isinstance(parameters, dict):
+        return '{' + ', '.join(f'{name}: {_type_name(value)}' for name, value in parameters.items()) + '}'
+    if isinstance(parameters, (list, tuple)):
+        return '(' + ', '.join(_type_name(value) for value in parameters) + ')'
+    return _type_name(parameters)
+
+def _origin():
+    """The endpoint (or CLI command) a statement was issued from"""
+    if has_request_context():
+        return request.endpoint or request.path
+    context = click.get_current_context(silent=True)
+    if context is not None:
+        return f'cli:{context.info_name}'
+    return None
+
+def _explain(connection, statement, parameters, analyze=False):
+    """The query plan of a statement, as a list of lines
+
+    Runs on a separate cursor of the same DBAPI connection, so the result set
+    of the statement being logged is left untouched. On PostgreSQL it runs
+    inside a savepoint, so a failing EXPLAIN doesn't abort the caller's
+    transaction; with ``analyze``, plain SELECTs get EXPLAIN ANALYZE (they
+    are executed a second time). Anything else, including WITH queries that
+    may hold data-modifying CTEs, only gets EXPLAIN.
+    """
+    dialect = connection.dialect.name
+    savepoint = dialect == 'postgresql'
+    if dialect == 'sqlite':
+        prefix = 'EXPLAIN QUERY PLAN '
+    elif savepoint and analyze and statement.lstrip().upper().startswith('SELECT'):
+        prefix = 'EXPLAIN (ANALYZE, BUFFERS) '
+    else:
+        prefix = 'EXPLAIN '
+    cursor = connection.connection.cursor()
+    try:
+        if savepoint:
+            cursor.execute('SAVEPOINT slow_query_explain')
+        try:
+            cursor.execute(prefix + statement, parameters)
+            rows = cursor.fetchall()
+        except Exception as e:
+            if savepoint:
+                cursor.execute('ROLLBACK TO SAVEPOINT slow_query_explain')
+            return [f'EXPLAIN failed: {e}']
+        finally:
+            if savepoint:
+                cursor.execute('RELEASE SAVEPOINT slow_query_explain')
+    except Exception as e:
+        # No transaction to hold the savepoint (autocommit connection)
+        return [f'EXPLAIN failed: {e}']
+    finally:
+        cursor.close()
+    if dialect == 'sqlite':
+        # (id, parent, notused, detail)
+        return [row[-1] for row in rows]
+    return [' '.join(str(value) for value in row) for row in rows]
+
+class SlowQueryLog:
+    """Append statements slower than a threshold to a JSON-lines file
+
+    The plan of each distinct statement is captured the first time it is
+    slow in this process, which keeps the EXPLAIN overhead off repeat
+    offenders.
+    """
+
+    def __init__(self, path, threshold_ms, logger=None, analyze=False):
+        self.path = path
+        self.threshold = threshold_ms / 1000
+        self.analyze = analyze
+        self.logger = logger
+        self.explained = set()
+        self.lock = threading.Lock()
+
+    def attach(self, engine):
+        event.listen(engine, 'before_cursor_execute', self._before)
+        event.listen(engine, 'after_cursor_execute', self._after)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        context._slowlog_start = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - getattr(context, '_slowlog_start', time.perf_counter())
+        if elapsed < self.threshold:
+            return
+
+        executemany = _is_many(parameters, executemany)
+        normalized = normalize(statement)
+        key = fingerprint(normalized)
+        entry = {
+            'time': datetime.utcnow().isoformat(timespec='seconds'),
+            'duration_ms': round(elapsed * 1000, 3),
+            'fingerprint': key,
+            'origin': _origin(),
+            'statement': normalized,
+            'parameters': parameter_shape(parameters, executemany),
+        }
+        with self.lock:
+            capture = key not in self.explained and not executemany
+            self.explained.add(key)
+        if capture:
+            entry['plan'] = _explain(conn, statement, parameters, self.analyze)
+
+        line = json.dumps(entry) + '\n'
+        with self.lock:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'a') as f:
+                f.write(line)
+        if self.logger is not None:
+            self.logger.warning('Slow query (%.1f ms) from %s: %s', elapsed * 1000, entry['origin'], normalized[:200])
+
+def init_slow_query_log(app, db):
+    """Log statements slower than SLOW_QUERY_MS to SLOW_QUERY_LOG"""
+    threshold = app.config.get('SLOW_QUERY_MS')
+    if threshold is None:
+        return
+    log = SlowQueryLog(app.config['SLOW_QUERY_LOG'], threshold, app.logger, app.config.get('SLOW_QUERY_ANALYZE', False))
+    with app.app_context():
+        for engine in db.engines.values():
+            log.attach(engine)
+    app.extensions['slow_query_log'] = log
+
+def read_entries(path):
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+def summarize(entries):
+    """Group slow query entries by statement, worst cumulative time first"""
+    groups = {}
+    for entry in entries:
+        group = groups.setdefault(entry['fingerprint'], {
+            'fingerprint': entry['fingerprint'],
+            'statement': entry['statement'],
+            'count': 0,
+            'total_ms': 0.0,
+            'max_ms': 0.0,
+            'origins': Counter(),
+            'parameters': Counter(),
+            'plan': None,
+        })
+        group['count'] += 1
+        group['total_ms'] += entry['duration_ms']
+        group['max_ms'] = max(group['max_ms'], entry['duration_ms'])
+        group['origins'][entry.get('origin') or '-'] += 1
+        group['parameters'][entry.get('parameters') or '-'] += 1
+        if entry.get('plan'):
+            group['plan'] = entry['plan']
+    return sorted(groups.values(), key=lambda group: group['total_ms'], reverse=True)
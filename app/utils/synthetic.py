@@ -0,0 +1,439 @@
+import math
+import random
+from datetime import datetime, time, timedelta
+from itertools import accumulate
+from sqlalchemy import func, insert, select
+from werkzeug.security import generate_password_hash
+from app import db
+from app.models import User, Podcast, Brand, Campaign, Deal, AdPerformance, SpendEntry
+from app.utils.demographics import audience_profile
+from app.utils.ledger import month_of
+
+# (value, weight) pairs the generator draws from
+CATEGORIES = (
+    ('Technology', 18), ('Business', 16), ('Comedy', 14), ('News', 13),
+    ('Health', 11), ('Education', 10), ('Sports', 10), ('Entertainment', 8),
+)
+LANGUAGES = (('fr', 55), ('en', 30), ('es', 8), ('de', 4), ('it', 3))
+INDUSTRIES = (
+    ('Technology', 25), ('Retail', 15), ('Food', 12), ('Finance', 12),
+    ('Fashion', 10), ('Health', 10), ('Travel', 8), ('Education', 8),
+)
+AGE_BANDS = (('18-24', 20), ('25-34', 30), ('35-44', 25), ('45-54', 15), ('55+', 10))
+COUNTRIES = (('FR', 60), ('BE', 10), ('CH', 8), ('CA', 8), ('US', 8), ('ES', 6))
+COMPANY_SIZES = (('Startup', 45), ('SME', 40), ('Enterprise', 15))
+AD_TYPES = (('host-read', 60), ('mid-roll', 25), ('pre-roll', 15))
+STATUSES = (
+    ('draft', 5), ('pending', 15), ('negotiating', 10), ('approved', 10),
+    ('active', 25), ('completed', 30), ('cancelled', 5),
+)
+
+# Campaign statuses that went through a negotiation, and how it ended
+NEGOTIATED = {
+    'negotiating': 'pending', 'approved': 'accepted', 'active': 'accepted',
+    'completed': 'accepted', 'cancelled': 'rejected',
+}
+# Campaign statuses with delivered episodes, hence performance rows
+DELIVERING = ('active', 'completed')
+
+WORDS = (
+    'Le Grand', 'Café', 'Les Voix', 'Studio', 'Signal', 'Fréquence', 'Minute',
+    'Chronique', 'Horizon', 'Atelier', 'Le Labo', 'Écho', 'Radar', 'Tribune',
+)
+PASSWORD = 'password123'
+
+class Picker:
+    """Weighted draws from a fixed list of choices with a shared RNG"""
+
+    def __init__(self, rng, pairs):
+        self.rng = rng
+        self.values = [value for value, _ in pairs]
+        self.cum_weights = list(accumulate(weight for _, weight in pairs))
+
+    def __call__(self, k=None):
+        if k is None:
+            return self.rng.choices(self.values, cum_weights=self.cum_weights)[0]
+        return self.rng.choices(self.values, cum_weights=self.cum_weights, k=k)
+
+class SyntheticData:
+    """Deterministic generator of a large, realistic marketplace
+
+    Everything is drawn from one ``random.Random(seed)`` and dated relative to
+    ``start``, so the same arguments always produce the same rows. Rows are
+    written with executemany INSERTs of ``chunk_size`` rows, with explicit
+    primary keys allocated after the current maximum so nothing has to be read
+    back, and a commit per chunk so memory and transaction size stay flat.
+    """
+
+    def __init__(self, seed=42, start=None, days=365, chunk_size=5000, echo=print):
+        self.rng = random.Random(seed)
+        self.start = datetime.combine(start, time()) if start else datetime(2025, 1, 1)
+        self.days = days
+        self.chunk_size = chunk_size
+        self.echo = echo
+        self.counts = {}
+
+    def _next_id(self, model):
+        return (db.session.scalar(select(func.max(model.id))) or 0) + 1
+
+    def _moment(self, after=None):
+        """A random timestamp in the window (after ``after`` when given)"""
+        low = after or self.start
+        span = (self.start + timedelta(days=self.days) - low).total_seconds()
+        return low + timedelta(seconds=self.rng.random() * max(span, 0))
+
+    def _shares(self, pairs, primary):
+        """Random audience shares over ``pairs``, concentrated on ``primary``"""
+        weights = {value: self.rng.random() for value, _ in pairs}
+        weights[primary] += 2
+        total = sum(weights.values())
+        return {value: round(weight / total, 3) for value, weight in weights.items()}
+
+    def _audience(self, age, country):
+        """Audience demographics with the profile columns extracted from them"""
+        female = round(self.rng.uniform(0.2, 0.8), 2)
+        demographics = {
+            'age': self._shares(AGE_BANDS, age()),
+            'gender': {'female': female, 'male': round(1 - female, 2)},
+            'country': self._shares(COUNTRIES, country()),
+        }
+        return dict(audience_profile(demographics), audience_demographics=demographics)
+
+    def _write(self, model, rows):
+        """Insert an iterable of row dicts in chunks, returning the row count"""
+        table = model.__table__
+        count = 0
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                db.session.execute(insert(table), chunk)
+                db.session.commit()
+                count += len(chunk)
+                chunk = []
+        if chunk:
+            db.session.execute(insert(table), chunk)
+            db.session.commit()
+            count += len(chunk)
+        self.counts[table.name] = self.counts.get(table.name, 0) + count
+        self.echo(f'{table.name}: {count} rows')
+        return count
+
+    def users(self, count, user_type):
+        """Insert ``count`` users of a type and return their ids"""
+        first_id = self._next_id(User)
+        password_hash = generate_password_hash(PASSWORD)
+        prefix = 'host' if user_type == 'podcast_host' else 'brand'
+
+        def rows():
+            for user_id in range(first_id, first_id + count):
+                created_at = self._moment()
+                yield {
+                    'id': user_id,
+                    'email': f'{prefix}{user_id}@load.test',
+                    'username': f'{prefix}{user_id}',
+                    'password_hash': password_hash,
+                    'user_type': user_type,
+                    'full_name': f'{prefix.capitalize()} {user_id}',
+                    'is_active': True,
+                    'is_verified': self.rng.random() < 0.3,
+                    'created_at': created_at,
+                    'updated_at': created_at,
+                }
+
+        self._write(User, rows())
+        return list(range(first_id, first_id + count))
+
+    def podcasts(self, count, host_ids):
+        """Insert podcasts and return (ids, owner user ids, average listeners)"""
+        first_id = self._next_id(Podcast)
+        category = Picker(self.rng, CATEGORIES)
+        language = Picker(self.rng, LANGUAGES)
+        age = Picker(self.rng, AGE_BANDS)
+        country = Picker(self.rng, COUNTRIES)
+        owners, listeners = [], []
+
+        def rows():
+            for podcast_id in range(first_id, first_id + count):
+                # Audiences are long-tailed: median around 2k, a few above 100k
+                audience = min(int(self.rng.lognormvariate(7.6, 1.3)), 2_000_000)
+                rate = round(audience / 1000 * self.rng.uniform(15, 35), 2)
+                topic = category()
+                owner = self.rng.choice(host_ids)
+                owners.append(owner)
+                listeners.append(audience)
+                created_at = self._moment()
+                yield {
+                    'id': podcast_id,
+                    'user_id': owner,
+                    'title': f'{self.rng.choice(WORDS)} {topic} #{podcast_id}',
+                    'description': f'Podcast {topic.lower()} en {self.rng.randint(10, 90)} minutes',
+                    'category': topic,
+                    'language': language(),
+                    'average_listeners': audience,
+                    'total_episodes': self.rng.randint(1, 400),
+                    'is_accepting_ads': self.rng.random() < 0.85,
+                    'min_rate': max(rate * 0.7, 20),
+                    'max_rate': max(rate * 1.5, 50),
+                    'is_active': self.rng.random() < 0.95,
+                    'is_verified': self.rng.random() < 0.2,
+                    'created_at': created_at,
+                    'updated_at': created_at,
+                    **self._audience(age, country),
+                }
+
+        self._write(Podcast, rows())
+        return list(range(first_id, first_id + count)), owners, listeners
+
+    def brands(self, count, brand_user_ids):
+        """Insert brands and return (ids, owner user ids)"""
+        first_id = self._next_id(Brand)
+        industry = Picker(self.rng, INDUSTRIES)
+        company_size = Picker(self.rng, COMPANY_SIZES)
+        category = Picker(self.rng, CATEGORIES)
+        age = Picker(self.rng, AGE_BANDS)
+        country = Picker(self.rng, COUNTRIES)
+        owners = []
+
+        def rows():
+            for brand_id in range(first_id, first_id + count):
+                owner = self.rng.choice(brand_user_ids)
+                owners.append(owner)
+                sector = industry()
+                created_at = self._moment()
+                yield {
+                    'id': brand_id,
+                    'user_id': owner,
+                    'name': f'{sector} Co {brand_id}',
+                    'description': f'Marque {sector.lower()} #{brand_id}',
+                    'industry': sector,
+                    'company_size': company_size(),
+                    'contact_email': f'contact{brand_id}@load.test',
+                    'monthly_budget': round(self.rng.lognormvariate(8, 1), 2),
+                    'target_demographics': {
+                        'age': sorted(set(age(k=2))),
+                        'country': [country()],
+                    },
+                    'preferred_categories': sorted(set(category(k=2))),
+                    'total_spent': 0,
+                    'is_active': self.rng.random() < 0.95,
+                    'is_verified': self.rng.random() < 0.25,
+                    'created_at': created_at,
+                    'updated_at': created_at,
+                }
+
+        self._write(Brand, rows())
+        return list(range(first_id, first_id + count)), owners
+
+    def campaigns(self, count, podcasts, brands, deliveries=None):
+        """Insert campaigns, popular podcasts getting proportionally more
+
+        With ``deliveries``, the active and completed campaigns add up to
+        exactly that many delivered episodes: campaigns are added past
+        ``count`` until they do, and once they do, further draws of a
+        delivering status are redrawn among the others.
+
+        Returns a list of (campaign id, status, podcast index, brand index,
+        proposed rate, negotiated rate, total episodes, episodes completed,
+        start) per campaign, for the deals and performance rows that follow.
+        """
+        podcast_ids, _, listeners = podcasts
+        brand_ids, _ = brands
+        first_id = self._next_id(Campaign)
+        status_of = Picker(self.rng, STATUSES)
+        undelivered_status = Picker(self.rng, [pair for pair in STATUSES if pair[0] not in DELIVERING])
+        ad_type = Picker(self.rng, AD_TYPES)
+        # Weight by sqrt(audience) so big shows are busy without taking everything
+        podcast_weights = list(accumulate(math.sqrt(value + 1) for value in listeners))
+        indexes = range(len(podcast_ids))
+        summary = []
+
+        def rows():
+            remaining = deliveries
+            campaign_id = first_id
+            while campaign_id < first_id + count or remaining:
+                podcast = self.rng.choices(indexes, cum_weights=podcast_weights)[0]
+                brand = self.rng.randrange(len(brand_ids))
+                status = status_of()
+                if remaining == 0 and status in DELIVERING:
+                    status = undelivered_status()
+                episodes = self.rng.randint(1, 12)
+                proposed = round(listeners[podcast] / 1000 * self.rng.uniform(10, 30) + 50, 2)
+                negotiated = None
+                if status in NEGOTIATED:
+                    negotiated = round(proposed * self.rng.uniform(0.9, 1.25), 2)
+                created_at = self._moment()
+                start = (created_at + timedelta(days=self.rng.randint(3, 30))).date()
+                completed = 0
+                if status == 'completed':
+                    completed = episodes
+                elif status == 'active':
+                    completed = self.rng.randrange(episodes)
+                if remaining is not None and completed > remaining:
+                    # The last delivering campaign is cut to the target
+                    completed = remaining
+                    if status == 'completed':
+                        episodes = completed
+                if remaining is not None:
+                    remaining -= completed
+                summary.append((campaign_id, status, podcast, brand, proposed, negotiated, episodes, completed, start))
+                yield {
+                    'id': campaign_id,
+                    'brand_id': brand_ids[brand],
+                    'podcast_id': podcast_ids[podcast],
+                    'title': f'Campagne {campaign_id}',
+                    'ad_type': ad_type(),
+                    'ad_duration': self.rng.choice((30, 45, 60, 90)),
+                    'start_date': start,
+                    'end_date': start + timedelta(weeks=episodes),
+                    'total_episodes': episodes,
+                    'episodes_completed': completed,
+                    'proposed_rate': proposed,
+                    'negotiated_rate': negotiated,
+                    'total_budget': round(negotiated * episodes, 2) if negotiated else None,
+                    'promo_code': f'PM{campaign_id}',
+                    'content_approval_status': 'approved' if status in DELIVERING else 'pending',
+                    'status': status,
+                    'target_impressions': listeners[podcast] * episodes,
+                    'created_at': created_at,
+                    'updated_at': created_at,
+                    'approved_at': created_at + timedelta(days=2) if NEGOTIATED.get(status) == 'accepted' else None,
+                    'completed_at': datetime.combine(start + timedelta(weeks=episodes), time()) if status == 'completed' else None,
+                }
+                campaign_id += 1
+
+        self._write(Campaign, rows())
+        return summary
+
+    def deals(self, campaigns, podcasts, brands):
+        """Insert a negotiation chain for every campaign that was negotiated
+
+        Offers alternate between the brand (initial offer) and the host
+        (counter-offers), converging on the negotiated rate; the last offer is
+        accepted, rejected or still pending depending on the campaign status.
+        """
+        _, podcast_owners, _ = podcasts
+        _, brand_owners = brands
+        first_id = self._next_id(Deal)
+
+        def rows():
+            deal_id = first_id
+            for campaign_id, status, podcast, brand, proposed, negotiated, _, _, start in campaigns:
+                if status not in NEGOTIATED:
+                    continue
+                length = self.rng.randint(1, 4)
+                offered_at = datetime.combine(start, time()) - timedelta(days=length + 1)
+                for step in range(length):
+                    last = step == length - 1
+                    rate = round(proposed + (negotiated - proposed) * (step + 1) / length, 2)
+                    from_brand = step % 2 == 0
+                    yield {
+                        'id': deal_id,
+                        'campaign_id': campaign_id,
+                        'from_user_id': brand_owners[brand] if from_brand else podcast_owners[podcast],
+                        'offer_type': 'initial' if step == 0 else ('final' if last and length > 2 else 'counter'),
+                        'offered_rate': rate,
+                        'response_status': NEGOTIATED[status] if last else 'countered',
+                        'response_date': None if last and status == 'negotiating' else offered_at + timedelta(hours=12),
+                        'created_at': offered_at,
+                    }
+                    deal_id += 1
+                    offered_at += timedelta(days=1)
+
+        self._write(Deal, rows())
+
+    def performance(self, campaigns, podcasts):
+        """Insert one performance row per delivered episode, numbered 1..n
+
+        Episode n of a campaign airs in its n-th week, so the rows match the
+        campaigns' episodes_completed and the spend ledger written next.
+        """
+        _, _, listeners = podcasts
+        delivered = [c for c in campaigns if c[7]]
+        if not delivered:
+            self.echo('ad_performance: no delivered episode, skipped')
+            return
+        first_id = self._next_id(AdPerformance)
+
+        def rows():
+            performance_id = first_id
+            for campaign_id, _, podcast, _, _, _, _, completed, start in delivered:
+                for number in range(1, completed + 1):
+                    impressions = int(listeners[podcast] * self.rng.uniform(0.5, 1.1))
+                    clicks = int(impressions * self.rng.uniform(0.005, 0.03))
+                    promo_uses = int(impressions * self.rng.uniform(0.001, 0.01))
+                    conversions = int((clicks + promo_uses) * self.rng.uniform(0.1, 0.4))
+                    day = start + timedelta(days=7 * (number - 1) + self.rng.randint(0, 6))
+                    yield {
+                        'id': performance_id,
+                        'campaign_id': campaign_id,
+                        'episode_title': f'Épisode {number}',
+                        'episode_date': day,
+                        'episode_number': number,
+                        'impressions': impressions,
+                        'unique_listeners': int(impressions * self.rng.uniform(0.7, 0.95)),
+                        'click_throughs': clicks,
+                        'promo_code_uses': promo_uses,
+                        'conversions': conversions,
+                        'revenue_generated': round(conversions * self.rng.uniform(20, 80), 2),
+                        'attribution_days': 30,
+                        'tracked_date': day,
+                        'created_at': datetime.combine(day, time()),
+                        'updated_at': datetime.combine(day, time()),
+                    }
+                    performance_id += 1
+
+        self._write(AdPerformance, rows())
+
+    def spend(self):
+        """Insert the spend ledger of the delivered episodes
+
+        One delivery entry per performance row, at the campaign's negotiated
+        rate and dated on the episode's tracked date, with each brand's
+        running balance; brands are read one at a time to keep memory flat.
+        Brand totals and monthly snapshots are left to ``flask recount``.
+        """
+        brand_ids = db.session.scalars(
+            select(Campaign.brand_id).where(Campaign.episodes_completed > 0).distinct().order_by(Campaign.brand_id)
+        ).all()
+        first_id = self._next_id(SpendEntry)
+
+        def rows():
+            entry_id = first_id
+            for brand_id in brand_ids:
+                deliveries = db.session.execute(
+                    select(AdPerformance.campaign_id, Campaign.negotiated_rate, AdPerformance.tracked_date)
+                    .join(Campaign, Campaign.id == AdPerformance.campaign_id)
+                    .where(Campaign.brand_id == brand_id, Campaign.negotiated_rate.isnot(None))
+                    .order_by(AdPerformance.tracked_date, AdPerformance.id)
+                ).all()
+                balance = 0
+                for campaign_id, rate, day in deliveries:
+                    balance += rate
+                    yield {
+                        'id': entry_id,
+                        'brand_id': brand_id,
+                        'campaign_id': campaign_id,
+                        'kind': 'delivery',
+                        'amount': rate,
+                        'episodes': 1,
+                        'rate': rate,
+                        'balance': balance,
+                        'month': month_of(day),
+                        'created_at': datetime.combine(day, time()),
+                    }
+                    entry_id += 1
+
+        self._write(SpendEntry, rows())
+
+    def generate(self, podcasts, brands, campaigns, performance):
+        """Generate the whole data set, in dependency order"""
+        hosts = self.users(max(1, math.ceil(podcasts / 2)), 'podcast_host')
+        brand_users = self.users(max(1, math.ceil(brands / 2)), 'brand')
+        podcast_rows = self.podcasts(podcasts, hosts)
+        brand_rows = self.brands(brands, brand_users)
+        campaign_rows = self.campaigns(campaigns, podcast_rows, brand_rows, deliveries=performance)
+        self.deals(campaign_rows, podcast_rows, brand_rows)
+        self.performance(campaign_rows, podcast_rows)
+        self.spend()
+        return self.counts
@@ -0,0 +1,121 @@
+import math
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import select
+from app import db
+from app.models import SpendEntry
+
+BUCKETS = ('day', 'week', 'month')
+# Range shown when the caller gives no start date, in days
+DEFAULT_SPANS = {'day': 90, 'week': 26 * 7, 'month': 365}
+MAX_POINTS = 1000
+MAX_SPAN_DAYS = 10 * 366
+
+# Additive series, summed per bucket; ctr and roi are derived from their sums
+SUMS = ('impressions', 'clicks', 'conversions', 'revenue', 'spend')
+ROLLUP_COLUMNS = {
+    'impressions': 'impressions',
+    'clicks': 'click_throughs',
+    'conversions': 'conversions',
+    'revenue': 'revenue_generated',
+}
+
+def bucket_start(day, bucket):
+    """The first day of the bucket containing ``day`` (weeks start on Monday)"""
+    if bucket == 'week':
+        return day - timedelta(days=day.weekday())
+    if bucket == 'month':
+        return day.replace(day=1)
+    return day
+
+def _next_bucket(start, bucket):
+    if bucket == 'week':
+        return start + timedelta(weeks=1)
+    if bucket == 'month':
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start + timedelta(days=1)
+
+def parse_range(args):
+    """(bucket, first day, last day, max points) from the query string
+
+    Raises ValueError with a client-facing message on bad input.
+    """
+    bucket = args.get('bucket', 'day')
+    if bucket not in BUCKETS:
+        raise ValueError(f'bucket must be one of {", ".join(BUCKETS)}')
+    try:
+        end = date.fromisoformat(args['to']) if args.get('to') else datetime.utcnow().date()
+        start = date.fromisoformat(args['from']) if args.get('from') else end - timedelta(days=DEFAULT_SPANS[bucket] - 1)
+    except ValueError:
+        raise ValueError('from and to must be YYYY-MM-DD dates')
+    if start > end:
+        raise ValueError('from must not be after to')
+    if (end - start).days >= MAX_SPAN_DAYS:
+        raise ValueError('date range is limited to 10 years')
+    max_points = min(max(args.get('max_points', 200, type=int), 1), MAX_POINTS)
+    return bucket, start, end, max_points
+
+def time_series(rollup, rollup_criteria, spend_criteria, bucket, start, end, max_points):
+    """Aligned, gap-filled metric series of one scope between ``start`` and ``end``
+
+    Performance comes from the daily rollup ``rollup`` (one row per day of the
+    scope, by tracked date), spend from the spend ledger, whose delivery
+    entries are dated on the same tracked dates, so backfilled episodes line
+    up with their revenue. Buckets without activity are zeros.
+    When there are more buckets than ``max_points``, consecutive buckets are
+    merged into wider points and the ratios recomputed from the merged sums.
+    """
+    labels = []
+    cursor = bucket_start(start, bucket)
+    while cursor <= end:
+        labels.append(cursor)
+        cursor = _next_bucket(cursor, bucket)
+    index = {label: position for position, label in enumerate(labels)}
+    sums = {name: [0] * len(labels) for name in SUMS}
+
+    rows = db.session.execute(
+        select(rollup.day, *[getattr(rollup, column) for column in ROLLUP_COLUMNS.values()])
+        .where(*rollup_criteria, rollup.day >= start, rollup.day <= end)
+    )
+    for day, *values in rows:
+        position = index[bucket_start(day, bucket)]
+        for name, value in zip(ROLLUP_COLUMNS, values):
+            sums[name][position] += value
+
+    entries = db.session.execute(
+        select(SpendEntry.created_at, SpendEntry.amount).where(
+            *spend_criteria,
+            SpendEntry.created_at >= datetime.combine(start, time()),
+            SpendEntry.created_at < datetime.combine(end + timedelta(days=1), time())
+        )
+    )
+    for created_at, amount in entries:
+        sums['spend'][index[bucket_start(created_at.date(), bucket)]] += amount
+
+    step = math.ceil(len(labels) / max_points)
+    if step > 1:
+        labels = labels[::step]
+        sums = {
+            name: [sum(values[i:i + step]) for i in range(0, len(values), step)]
+            for name, values in sums.items()
+        }
+
+    series = dict(sums)
+    for name in ('revenue', 'spend'):
+        series[name] = [round(value, 2) for value in sums[name]]
+    series['ctr'] = [
+        round(clicks / impressions * 100, 2) if impressions else 0
+        for clicks, impressions in zip(sums['clicks'], sums['impressions'])
+    ]
+    series['roi'] = [
+        round((revenue - spend) / spend * 100, 2) if spend else 0
+        for revenue, spend in zip(sums['revenue'], sums['spend'])
+    ]
+
+    return {
+        'bucket': bucket,
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'step': step,
+        'labels': [label.isoformat() for label in labels],
+        'series': series
+    }
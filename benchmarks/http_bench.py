@@ -0,0 +1,360 @@
+"""HTTP benchmark of the hot endpoints of every blueprint
+
+Runs each scenario against the Flask test client (in-process, no network) or
+a local gunicorn started with gunicorn.conf.py, and reports p50/p95/p99
+latency, requests per second and SQL statements per request:
+
+    python benchmarks/http_bench.py                        # test client
+    python benchmarks/http_bench.py --target gunicorn --concurrency 8
+    python benchmarks/http_bench.py --save benchmarks/baseline.json
+
+Results are compared with the baseline (benchmarks/baseline.json by default):
+an endpoint regresses when its p95 grows by more than --tolerance (and
+--min-delta-ms) or when it issues more SQL statements than before; --fail-on-regression turns that
+into a non-zero exit status for CI.
+
+Without --database a temporary SQLite database is migrated and filled with
+``flask seed-scale``'s generator (--podcasts etc. set its size). Scenarios
+create deals and performance rows, so point --database only at disposable
+data.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import CookieJar
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+JSON_HEADERS = {'Content-Type': 'application/json'}
+
+class Scenario:
+    """One endpoint to hit: who calls it and how to build each request
+
+    ``build(fixtures, clients)`` returns (method, path, json body or None,
+    headers); it may issue untimed requests of its own to prepare state.
+    """
+
+    def __init__(self, name, user, build):
+        self.name = name
+        self.user = user
+        self.build = build
+
+def _get(path, json_response=False):
+    return lambda fixtures, clients: ('GET', path.format(**fixtures), None, JSON_HEADERS if json_response else {})
+
+def _create_deal(fixtures, clients):
+    body = {'campaign_id': fixtures['campaign_id'], 'offered_rate': 250}
+    return 'POST', '/deals/create', body, JSON_HEADERS
+
+def _respond_to_deal(fixtures, clients):
+    # The brand makes an offer (untimed), the host answers it (timed)
+    status, body = clients['brand'].request(*_create_deal(fixtures, clients))
+    deal_id = json.loads(body)['deal']['id']
+    return 'POST', f'/deals/{deal_id}/respond', {'response_status': 'countered'}, JSON_HEADERS
+
+def _bulk_performance(fixtures, clients):
+    records = [
+        {
+            'campaign_id': fixtures['campaign_id'],
+            'impressions': 1000 + index,
+            'click_throughs': 20,
+            'conversions': 2,
+            'revenue_generated': 50,
+            'tracked_date': fixtures['tracked_date'],
+        }
+        for index in range(100)
+    ]
+    return 'POST', '/analytics/performance/bulk', {'records': records}, JSON_HEADERS
+
+SCENARIOS = [
+    Scenario('main.marketplace', None, _get('/marketplace')),
+    Scenario('main.marketplace?search', None, _get('/marketplace?search={search}')),
+    Scenario('podcasts.list_podcasts?category', None, _get('/podcasts/?category={category}')),
+    Scenario('main.dashboard[host]', 'host', _get('/dashboard')),
+    Scenario('main.dashboard[brand]', 'brand', _get('/dashboard')),
+    Scenario('main.api_stats[host]', 'host', _get('/api/stats', True)),
+    Scenario('main.api_stats[brand]', 'brand', _get('/api/stats', True)),
+    Scenario('analytics.campaign_analytics', 'host', _get('/analytics/campaign/{campaign_id}', True)),
+    Scenario('analytics.podcast_analytics', 'host', _get('/analytics/podcast/{podcast_id}', True)),
+    Scenario('analytics.brand_analytics', 'brand', _get('/analytics/brand/{brand_id}', True)),
+    Scenario('deals.create_deal', 'brand', _create_deal),
+    Scenario('deals.respond_to_deal', 'host', _respond_to_deal),
+    Scenario('analytics.add_performance_bulk[100]', 'host', _bulk_performance),
+]
+
+class TestClientSession:
+    """A logged-in (or anonymous) user talking to the app in-process"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, body=None, headers=None):
+        response = self.client.open(path, method=method, json=body, headers=headers)
+        return response.status_code, response.get_data()
+
+    def sql_count(self, method, path, body=None, headers=None):
+        response = self.client.open(path, method=method, json=body, headers=headers)
+        return response.status_code, response.headers.get('X-SQL-Queries')
+
+class HTTPSession:
+    """A logged-in (or anonymous) user talking to a server over HTTP"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(CookieJar()))
+
+    def _open(self, method, path, body=None, headers=None):
+        data = None
+        if body is not None:
+            data = json.dumps(body).encode('utf-8')
+        elif method == 'POST':
+            data = b''
+        request = urllib.request.Request(self.base_url + path, data=data, method=method, headers=headers or {})
+        try:
+            return self.opener.open(request)
+        except urllib.error.HTTPError as e:
+            return e
+
+    def request(self, method, path, body=None, headers=None):
+        with self._open(method, path, body, headers) as response:
+            return response.status, response.read()
+
+    def sql_count(self, method, path, body=None, headers=None):
+        with self._open(method, path, body, headers) as response:
+            response.read()
+            return response.status, response.headers.get('X-SQL-Queries')
+
+    def login(self, email, password):
+        data = urllib.parse.urlencode({'email': email, 'password': password}).encode('utf-8')
+        with self.opener.open(self.base_url + '/auth/login', data=data) as response:
+            response.read()
+
+def prepare_database(args):
+    """Migrate and seed a temporary database unless one was given"""
+    if args.database:
+        return args.database
+    path = os.path.join(tempfile.mkdtemp(prefix='podcastmarket-bench-'), 'bench.db')
+    url = f'sqlite:///{path}'
+    os.environ['DATABASE_URL'] = url
+    from flask_migrate import upgrade
+    from app import create_app, db
+    from app.utils.rollups import rebuild_rollups
+    from app.utils.search import search_index
+    from app.utils.synthetic import SyntheticData
+    app = create_app('benchmark')
+    with app.app_context():
+        upgrade(directory=os.path.join(ROOT, 'migrations'))
+        SyntheticData(seed=args.seed, echo=lambda message: None).generate(
+            args.podcasts, args.brands, args.campaigns, args.performance
+        )
+        rebuild_rollups()
+        search_index.rebuild()
+        db.session.commit()
+    print(f'Seeded {path}')
+    return url
+
+def find_fixtures(app):
+    """Pick a negotiating pair (host, brand) with an active campaign between them"""
+    from app import db
+    from app.models import Brand, Campaign, Podcast, User
+    with app.app_context():
+        campaign = Campaign.query.filter_by(status='active').order_by(Campaign.id).first()
+        if campaign is None:
+            raise SystemExit('The database has no active campaign to benchmark against')
+        podcast = db.session.get(Podcast, campaign.podcast_id)
+        brand = db.session.get(Brand, campaign.brand_id)
+        return {
+            'campaign_id': campaign.id,
+            'podcast_id': podcast.id,
+            'brand_id': brand.id,
+            'host_email': db.session.get(User, podcast.user_id).email,
+            'brand_email': db.session.get(User, brand.user_id).email,
+            'category': podcast.category or 'Technology',
+            'search': (podcast.title or 'podcast').split()[0],
+            'tracked_date': (campaign.start_date or campaign.created_at.date()).isoformat(),
+        }
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def start_gunicorn(database_url, workers):
+    port = free_port()
+    env = dict(os.environ, DATABASE_URL=database_url, FLASK_ENV='benchmark', PORT=str(port),
+               WEB_CONCURRENCY=str(workers), GUNICORN_ACCESS_LOG='/dev/null')
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base_url = f'http://127.0.0.1:{port}'
+    for _ in range(100):
+        try:
+            with urllib.request.urlopen(base_url + '/health') as response:
+                if response.status == 200:
+                    return process, base_url
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise SystemExit('gunicorn did not start')
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def run_scenario(scenario, sessions, fixtures, requests, concurrency):
+    """Time ``requests`` calls of a scenario, returning its summary"""
+    session = sessions[scenario.user]
+    # Warm-up call, also used to read the SQL statement count
+    status, sql = session.sql_count(*scenario.build(fixtures, sessions))
+    if status >= 400:
+        raise SystemExit(f'{scenario.name} answered {status}')
+
+    latencies = []
+    lock = threading.Lock()
+
+    def call(_):
+        method, path, body, headers = scenario.build(fixtures, sessions)
+        start = time.perf_counter()
+        session.request(method, path, body, headers)
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+
+    start = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(concurrency) as pool:
+            list(pool.map(call, range(requests)))
+    else:
+        for index in range(requests):
+            call(index)
+    # Preparation requests (deal offers) are excluded from the latencies but
+    # not from the wall time, so rps is a lower bound for those scenarios
+    wall = time.perf_counter() - start
+
+    return {
+        'requests': requests,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 2),
+        'rps': round(requests / wall, 1),
+        'sql': int(sql) if sql is not None else None,
+    }
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    """Regressions of ``results`` against ``baseline``, as printable lines
+
+    Sub-millisecond endpoints jitter by more than any sensible percentage, so
+    a latency regression must also exceed ``min_delta_ms`` in absolute terms.
+    """
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        slower = result['p95_ms'] - before['p95_ms']
+        if slower > before['p95_ms'] * tolerance and slower > min_delta_ms:
+            regressions.append(f"{name}: p95 {before['p95_ms']} -> {result['p95_ms']} ms")
+        if result['sql'] is not None and before.get('sql') is not None and result['sql'] > before['sql']:
+            regressions.append(f"{name}: SQL statements {before['sql']} -> {result['sql']}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--target', choices=('testclient', 'gunicorn'), default='testclient')
+    parser.add_argument('--database', help='database URL to run against (default: seeded temporary SQLite)')
+    parser.add_argument('--requests', type=int, default=200, help='timed requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=1, help='parallel clients (gunicorn target)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help='gunicorn workers')
+    parser.add_argument('--only', help='run the scenarios whose name contains this text')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed p95 growth (0.25 = +25%%)')
+    parser.add_argument('--min-delta-ms', type=float, default=2.0, help='ignore p95 changes below this')
+    parser.add_argument('--save', help='write the results to this baseline file')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    parser.add_argument('--password', default='password123')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--podcasts', type=int, default=500)
+    parser.add_argument('--brands', type=int, default=100)
+    parser.add_argument('--campaigns', type=int, default=5000)
+    parser.add_argument('--performance', type=int, default=50000)
+    args = parser.parse_args()
+
+    database_url = prepare_database(args)
+    os.environ['DATABASE_URL'] = database_url
+    from app import create_app
+    app = create_app('benchmark')
+    fixtures = find_fixtures(app)
+
+    process = None
+    if args.target == 'gunicorn':
+        process, base_url = start_gunicorn(database_url, args.workers)
+        make_session = lambda: HTTPSession(base_url)
+        if args.concurrency == 1:
+            args.concurrency = args.workers
+    else:
+        make_session = lambda: TestClientSession(app)
+        args.concurrency = 1
+
+    try:
+        sessions = {None: make_session(), 'host': make_session(), 'brand': make_session()}
+        for user in ('host', 'brand'):
+            session = sessions[user]
+            if isinstance(session, HTTPSession):
+                session.login(fixtures[f'{user}_email'], args.password)
+            else:
+                session.client.post('/auth/login', data={'email': fixtures[f'{user}_email'], 'password': args.password})
+
+        results = {}
+        print(f"{'endpoint':40} {'p50':>8} {'p95':>8} {'p99':>8} {'rps':>8} {'sql':>4}")
+        for scenario in SCENARIOS:
+            if args.only and args.only not in scenario.name:
+                continue
+            result = run_scenario(scenario, sessions, fixtures, args.requests, args.concurrency)
+            results[scenario.name] = result
+            print(f"{scenario.name:40} {result['p50_ms']:8.2f} {result['p95_ms']:8.2f} "
+                  f"{result['p99_ms']:8.2f} {result['rps']:8.1f} {result['sql'] if result['sql'] is not None else '-':>4}")
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    stored = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            stored = json.load(f)
+    regressions = compare(results, stored.get(args.target, {}), args.tolerance, args.min_delta_ms)
+    for line in regressions:
+        print(f'REGRESSION {line}')
+
+    if args.save:
+        saved = {}
+        if os.path.exists(args.save):
+            with open(args.save) as f:
+                saved = json.load(f)
+        saved[args.target] = {**saved.get(args.target, {}), **results}
+        with open(args.save, 'w') as f:
+            json.dump(saved, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f'Results saved to {args.save}')
+
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+    print('Benchmark complete!')
+
+if __name__ == '__main__':
+    main()
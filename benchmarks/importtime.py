@@ -0,0 +1,66 @@
+"""Import-time budget check for the application's cold start
+
+Imports run.py in a fresh interpreter under ``python -X importtime`` (with
+routes deferred, as the flask CLI does, unless --eager) and fails when the
+cumulative import time of run.py exceeds the budget:
+
+    python benchmarks/importtime.py --budget-ms 800
+    python benchmarks/importtime.py --eager --top 20
+
+The best of --repeat runs is kept, since the first run also pays for cold
+filesystem caches.
+"""
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def measure(eager):
+    """One interpreter run: {module: (self_us, cumulative_us)} in import order"""
+    env = dict(os.environ, FLASK_LAZY_ROUTES='0' if eager else '1')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import run'],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+def by_package(modules):
+    """Self time summed per top-level package, largest first"""
+    totals = defaultdict(int)
+    for name, (self_us, _) in modules.items():
+        totals[name.split('.')[0]] += self_us
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--budget-ms', type=float, default=float(os.environ.get('IMPORT_BUDGET_MS', 800)))
+    parser.add_argument('--eager', action='store_true', help='register the routes as a server process does')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    runs = [measure(args.eager) for _ in range(args.repeat)]
+    best = min(runs, key=lambda modules: modules['run'][1])
+    total_ms = best['run'][1] / 1000
+
+    print(f"import run ({'eager' if args.eager else 'lazy'} routes): {total_ms:.1f} ms, budget {args.budget_ms:.0f} ms")
+    print(f"{len(best)} modules imported, of which app.*: {sum(1 for name in best if name.split('.')[0] == 'app')}")
+    for package, self_us in by_package(best)[:args.top]:
+        print(f'  {package:<24} {self_us / 1000:8.1f} ms')
+
+    if total_ms > args.budget_ms:
+        print('Import time budget exceeded!')
+        sys.exit(1)
+    print('Within budget!')
+
+if __name__ == '__main__':
+    main()
@@ -10,6 +10,22 @@ class Config:
         'sqlite:///' + os.path.join(basedir, 'podcastmarket.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Connection pool for server databases (PostgreSQL, MySQL), per worker
+    # process: keep pool_size at least the number of threads per worker
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 5))
+    DB_POOL_TIMEOUT = 10
+    DB_POOL_RECYCLE = 1800
+    DB_POOL_PRE_PING = True
+    
+    # Applied to every new SQLite connection
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        'mmap_size': 256 * 1024 * 1024,
+    }
+    
     # Session configuration
     PERMANENT_SESSION_LIFETIME = timedelta(days=7)
     SESSION_COOKIE_SECURE = False  # Set True in production with HTTPS
@@ -19,6 +35,60 @@ class Config:
     # Pagination
     ITEMS_PER_PAGE = 20
     
+    # Full-text search: 'auto' picks the backend matching the database
+    # ('sqlite' FTS5, 'postgresql' tsvector), 'like' falls back to ILIKE scans
+    SEARCH_BACKEND = os.environ.get('SEARCH_BACKEND') or 'auto'
+    
+    # Run db.create_all() in create_app instead of migrations; only honoured
+    # with DEBUG or TESTING, for throwaway databases
+    AUTO_CREATE_SCHEMA = False
+    
+    # Response cache for public catalog pages: 'simple' (in-process LRU),
+    # 'redis' (CACHE_REDIS_URL, shared between workers) or 'null' (off)
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND') or 'simple'
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL') or 'redis://localhost:6379/0'
+    CACHE_DEFAULT_TIMEOUT = 300
+    CACHE_THRESHOLD = 1000
+    
+    # Seconds a logged-in user's identity (name, email, type) is cached per process
+    USER_CACHE_TIMEOUT = 60
+    
+    # N+1 guard: requests issuing more SQL statements than this are logged
+    # (or fail when SQL_QUERY_LIMIT_FAIL is set); None disables counting
+    SQL_QUERY_LIMIT = None
+    SQL_QUERY_LIMIT_FAIL = False
+    
+    # Per-endpoint request metrics served at /metrics (Prometheus format),
+    # only to scrapers sending METRICS_TOKEN (Authorization: Bearer ...) or
+    # connecting from METRICS_ALLOWED_IPS; with neither set /metrics is a 404
+    METRICS_ENABLED = True
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    METRICS_ALLOWED_IPS = tuple(filter(None, (os.environ.get('METRICS_ALLOWED_IPS') or '').split(',')))
+    
+    # Profile a sample of requests and keep the profiles of those slower than
+    # PROFILE_SLOW_REQUEST_MS (None disables profiling); PROFILER is
+    # 'cprofile' (.prof files, read with pstats/snakeviz) or 'pyinstrument'
+    PROFILE_SLOW_REQUEST_MS = int(os.environ['PROFILE_SLOW_REQUEST_MS']) if os.environ.get('PROFILE_SLOW_REQUEST_MS') else None
+    PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0.1))
+    PROFILER = os.environ.get('PROFILER') or 'cprofile'
+    PROFILE_DIR = os.path.join(basedir, 'profiles')
+    
+    # Statements slower than SLOW_QUERY_MS are appended to SLOW_QUERY_LOG
+    # with their parameter types, endpoint and query plan (None disables
+    # it); `flask slow-queries` summarizes the log
+    SLOW_QUERY_MS = float(os.environ['SLOW_QUERY_MS']) if os.environ.get('SLOW_QUERY_MS') else None
+    SLOW_QUERY_LOG = os.environ.get('SLOW_QUERY_LOG') or os.path.join(basedir, 'logs', 'slow_queries.jsonl')
+    # On PostgreSQL, capture slow SELECTs with EXPLAIN ANALYZE, which runs them again
+    SLOW_QUERY_ANALYZE = os.environ.get('SLOW_QUERY_ANALYZE', '').lower() in ('1', 'true', 'yes')
+    
+    # Brand-to-podcast recommendations: weight of each score component and
+    # how often (seconds) each process rebuilds its feature matrix from scratch
+    MATCHING_WEIGHTS = {'category': 0.35, 'demographics': 0.3, 'audience': 0.2, 'rate': 0.15}
+    MATCHING_MAX_AGE = 3600
+    
+    # Bulk performance ingestion: rows per INSERT batch / transaction
+    BULK_INSERT_CHUNK_SIZE = 1000
+    
     # File upload
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     UPLOAD_FOLDER = os.path.join(basedir, 'uploads')
@@ -27,22 +97,42 @@ class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
     TESTING = False
+    SQL_QUERY_LIMIT = 25
+    METRICS_ALLOWED_IPS = ('127.0.0.1', '::1')
+    SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 100))
+    AUTO_CREATE_SCHEMA = os.environ.get('AUTO_CREATE_SCHEMA', '').lower() in ('1', 'true', 'yes')
 
 class ProductionConfig(Config):
     """Production configuration"""
     DEBUG = False
     TESTING = False
     SESSION_COOKIE_SECURE = True
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = 5
+    # gunicorn runs several workers and 'simple' invalidations only reach
+    # one of them: cache only when a shared backend is configured
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND') or 'null'
+
+class BenchmarkConfig(ProductionConfig):
+    """Production settings over plain HTTP, reporting SQL counts (benchmarks/)"""
+    SESSION_COOKIE_SECURE = False
+    # High enough never to warn, only to fill the X-SQL-Queries header
+    SQL_QUERY_LIMIT = 10000
 
 class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
+    AUTO_CREATE_SCHEMA = True
+    SQL_QUERY_LIMIT = 25
+    SQL_QUERY_LIMIT_FAIL = True
 
 config = {
     'development': DevelopmentConfig,
     'production': ProductionConfig,
     'testing': TestingConfig,
+    'benchmark': BenchmarkConfig,
     'default': DevelopmentConfig
 }
@@ -2,19 +2,23 @@ module.exports = {
   apps: [
     {
       name: 'podcastmarket',
-      script: 'run.py',
-      interpreter: 'python3',
+      script: 'gunicorn',
+      args: '--config gunicorn.conf.py wsgi:app',
+      interpreter: 'none',
       env: {
-        FLASK_APP: 'run.py',
-        FLASK_ENV: 'development',
+        FLASK_ENV: 'production',
         PORT: 3000
       },
       watch: false,
+      // gunicorn manages its own worker processes (WEB_CONCURRENCY)
       instances: 1,
       exec_mode: 'fork',
       autorestart: true,
       max_restarts: 10,
-      min_uptime: '10s'
+      min_uptime: '10s',
+      // SIGTERM lets gunicorn finish in-flight requests (graceful_timeout)
+      kill_signal: 'SIGTERM',
+      kill_timeout: 35000
     }
   ]
 }
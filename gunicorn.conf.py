@@ -0,0 +1,68 @@
+"""Gunicorn settings for serving PodcastMarket in production
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Every setting can be overridden from the environment:
+
+- ``PORT`` / ``GUNICORN_BIND``: listening address (default ``0.0.0.0:3000``)
+- ``WEB_CONCURRENCY``: worker processes (default ``2 * cores + 1``)
+- ``GUNICORN_WORKER_CLASS``: ``gthread`` (default) or ``gevent``
+- ``GUNICORN_THREADS``: threads per gthread worker (default 4)
+- ``GUNICORN_WORKER_CONNECTIONS``: concurrent clients per gevent worker
+- ``GUNICORN_PRELOAD``: load the app once in the master before forking
+
+Graceful reload: ``kill -HUP <master>`` replaces the workers one by one and
+lets in-flight requests finish within ``graceful_timeout``. With preload on,
+HUP restarts the workers from the already imported code; to deploy new code
+without downtime send ``USR2`` (starts a new master) then ``TERM`` to the old
+master.
+"""
+import multiprocessing
+import os
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+bind = os.environ.get('GUNICORN_BIND') or f"0.0.0.0:{os.environ.get('PORT', '3000')}"
+
+# Workers are processes, so CPU-bound work (templates, JSON) scales across cores
+workers = _env_int('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1)
+
+# gthread overlaps the SQL and network waits of a worker's requests; gevent
+# (pip install gevent) suits many slow, mostly idle clients
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS') or 'gthread'
+threads = _env_int('GUNICORN_THREADS', 4)
+worker_connections = _env_int('GUNICORN_WORKER_CONNECTIONS', 1000)
+
+# Import the app (and run its startup queries) once in the master, so workers
+# fork from a warm copy and share its memory pages. gevent must monkey-patch
+# before the app is imported, so it loads the app in each worker instead.
+# Database connections opened by the master are dropped in each worker by
+# the app factory's fork hook (see create_app).
+preload_app = os.environ.get('GUNICORN_PRELOAD', str(worker_class != 'gevent')).lower() in ('1', 'true', 'yes')
+
+# Keep connections from the reverse proxy open between requests; must be
+# shorter than the proxy's upstream keep-alive timeout
+keepalive = _env_int('GUNICORN_KEEPALIVE', 5)
+timeout = _env_int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+
+# Recycle workers now and then so slow leaks never build up; the jitter keeps
+# them from all restarting at once
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = _env_int('GUNICORN_MAX_REQUESTS_JITTER', 100)
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+
+def on_starting(server):
+    # The in-process cache backend is invalidated per worker only
+    from config import config
+    settings = config[os.environ.get('FLASK_ENV', 'production')]
+    if settings.CACHE_BACKEND == 'simple' and server.cfg.workers > 1:
+        server.log.warning(
+            'CACHE_BACKEND=simple with %d workers: cached pages may stay stale for up to '
+            '%d s after a write on another worker; use CACHE_BACKEND=redis',
+            server.cfg.workers, settings.CACHE_DEFAULT_TIMEOUT
+        )
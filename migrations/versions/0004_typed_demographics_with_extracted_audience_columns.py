@@ -0,0 +1,163 @@
+"""typed demographics with extracted audience columns
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 15:06:00.914896
+
+"""
+import json
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+JSON_TYPE = sa.JSON().with_variant(postgresql.JSONB(astext_type=sa.Text()), 'postgresql')
+
+podcasts = sa.table(
+    'podcasts',
+    sa.column('id', sa.Integer),
+    sa.column('audience_demographics', sa.Text),
+    sa.column('primary_age_band', sa.String),
+    sa.column('female_share', sa.Float),
+    sa.column('primary_country', sa.String),
+)
+brands = sa.table(
+    'brands',
+    sa.column('id', sa.Integer),
+    sa.column('target_demographics', sa.Text),
+    sa.column('preferred_categories', sa.Text),
+)
+
+# Frozen copy of app.utils.demographics.audience_profile as of this revision
+ALIASES = {'location': 'country', 'ages': 'age', 'sex': 'gender'}
+
+
+def _parse(text, as_list=False):
+    """Valid JSON for a stored TEXT value; free text is kept as a JSON string
+    (or, for category lists, split on commas)"""
+    try:
+        return json.loads(text)
+    except ValueError:
+        if as_list:
+            return [part.strip() for part in text.split(',') if part.strip()]
+        return text
+
+
+def _profile(data):
+    shares = {}
+    if isinstance(data, dict):
+        for dimension, segments in data.items():
+            dimension = ALIASES.get(dimension, dimension)
+            if isinstance(segments, list):
+                segments = dict.fromkeys(segments, 1)
+            if not isinstance(segments, dict):
+                continue
+            weights = {str(s): float(w) for s, w in segments.items() if isinstance(w, (int, float)) and w > 0}
+            total = sum(weights.values())
+            shares[dimension] = {s: w / total for s, w in weights.items()}
+
+    def primary(dimension):
+        segments = shares.get(dimension)
+        return max((w, s) for s, w in segments.items())[1] if segments else None
+
+    country = primary('country')
+    return {
+        'primary_age_band': primary('age'),
+        'female_share': round(shares['gender'].get('female', 0.0), 4) if 'gender' in shares else None,
+        'primary_country': country.upper() if country else None,
+    }
+
+
+def _execute_many(bind, statement, rows, chunk_size=5000):
+    for start in range(0, len(rows), chunk_size):
+        bind.execute(statement, rows[start:start + chunk_size])
+
+
+def upgrade():
+    with op.batch_alter_table('podcasts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('primary_age_band', sa.String(length=10), nullable=True))
+        batch_op.add_column(sa.Column('female_share', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('primary_country', sa.String(length=10), nullable=True))
+
+    # Rewrite every stored value as valid JSON before the type change
+    # (PostgreSQL refuses to cast anything else) and fill the extracted columns
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(podcasts.c.id, podcasts.c.audience_demographics)
+        .where(podcasts.c.audience_demographics.isnot(None))
+    ).all()
+    updates = []
+    for podcast_id, text in rows:
+        data = _parse(text)
+        updates.append(dict(_profile(data), row_id=podcast_id, demographics=json.dumps(data)))
+    _execute_many(bind, podcasts.update().where(podcasts.c.id == sa.bindparam('row_id')).values(
+        audience_demographics=sa.bindparam('demographics'),
+        primary_age_band=sa.bindparam('primary_age_band'),
+        female_share=sa.bindparam('female_share'),
+        primary_country=sa.bindparam('primary_country'),
+    ), updates)
+
+    rows = bind.execute(
+        sa.select(brands.c.id, brands.c.target_demographics, brands.c.preferred_categories)
+        .where(sa.or_(brands.c.target_demographics.isnot(None), brands.c.preferred_categories.isnot(None)))
+    ).all()
+    updates = [{
+        'row_id': brand_id,
+        'demographics': None if demographics is None else json.dumps(_parse(demographics)),
+        'categories': None if categories is None else json.dumps(_parse(categories, as_list=True)),
+    } for brand_id, demographics, categories in rows]
+    _execute_many(bind, brands.update().where(brands.c.id == sa.bindparam('row_id')).values(
+        target_demographics=sa.bindparam('demographics'),
+        preferred_categories=sa.bindparam('categories'),
+    ), updates)
+
+    with op.batch_alter_table('brands', schema=None) as batch_op:
+        batch_op.alter_column('target_demographics',
+               existing_type=sa.TEXT(),
+               type_=JSON_TYPE,
+               existing_nullable=True,
+               postgresql_using='target_demographics::jsonb')
+        batch_op.alter_column('preferred_categories',
+               existing_type=sa.TEXT(),
+               type_=JSON_TYPE,
+               existing_nullable=True,
+               postgresql_using='preferred_categories::jsonb')
+
+    with op.batch_alter_table('podcasts', schema=None) as batch_op:
+        batch_op.alter_column('audience_demographics',
+               existing_type=sa.TEXT(),
+               type_=JSON_TYPE,
+               existing_nullable=True,
+               postgresql_using='audience_demographics::jsonb')
+        batch_op.create_index('ix_podcasts_age_average_listeners', ['primary_age_band', 'average_listeners', 'id'], unique=False)
+        batch_op.create_index('ix_podcasts_country_age_average_listeners', ['primary_country', 'primary_age_band', 'average_listeners', 'id'], unique=False)
+        batch_op.create_index('ix_podcasts_female_share', ['female_share'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('podcasts', schema=None) as batch_op:
+        batch_op.drop_index('ix_podcasts_female_share')
+        batch_op.drop_index('ix_podcasts_country_age_average_listeners')
+        batch_op.drop_index('ix_podcasts_age_average_listeners')
+        batch_op.alter_column('audience_demographics',
+               existing_type=JSON_TYPE,
+               type_=sa.TEXT(),
+               existing_nullable=True)
+        batch_op.drop_column('primary_country')
+        batch_op.drop_column('female_share')
+        batch_op.drop_column('primary_age_band')
+
+    with op.batch_alter_table('brands', schema=None) as batch_op:
+        batch_op.alter_column('preferred_categories',
+               existing_type=JSON_TYPE,
+               type_=sa.TEXT(),
+               existing_nullable=True)
+        batch_op.alter_column('target_demographics',
+               existing_type=JSON_TYPE,
+               type_=sa.TEXT(),
+               existing_nullable=True)
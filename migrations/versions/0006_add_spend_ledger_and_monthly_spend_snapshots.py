@@ -0,0 +1,115 @@
+"""add spend ledger and monthly spend snapshots
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 15:16:40.185293
+
+"""
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+campaigns = sa.table(
+    'campaigns',
+    sa.column('id', sa.Integer),
+    sa.column('brand_id', sa.Integer),
+    sa.column('negotiated_rate', sa.Float),
+    sa.column('episodes_completed', sa.Integer),
+    sa.column('created_at', sa.DateTime),
+    sa.column('approved_at', sa.DateTime),
+    sa.column('completed_at', sa.DateTime),
+)
+
+
+def _opening_entries(bind):
+    """One entry per campaign for what it delivered before the ledger existed,
+    dated at completion (or approval), with each brand's running balance"""
+    delivered = bind.execute(
+        sa.select(
+            campaigns.c.id, campaigns.c.brand_id, campaigns.c.negotiated_rate, campaigns.c.episodes_completed,
+            sa.func.coalesce(campaigns.c.completed_at, campaigns.c.approved_at, campaigns.c.created_at)
+        ).where(campaigns.c.episodes_completed > 0, campaigns.c.negotiated_rate.isnot(None))
+    ).all()
+    now = datetime.utcnow()
+    entries, snapshots, balances = [], {}, {}
+    for campaign_id, brand_id, rate, episodes, at in sorted(
+        delivered, key=lambda row: (row[1], row[4] or now, row[0])
+    ):
+        at = at or now
+        month = at.date().replace(day=1)
+        amount = rate * episodes
+        balances[brand_id] = balances.get(brand_id, 0) + amount
+        entries.append({
+            'brand_id': brand_id, 'campaign_id': campaign_id, 'kind': 'adjustment', 'amount': amount,
+            'episodes': episodes, 'rate': rate, 'balance': balances[brand_id], 'month': month, 'created_at': at,
+        })
+        snapshot = snapshots.setdefault((brand_id, month), {'brand_id': brand_id, 'month': month, 'spent': 0, 'entries': 0})
+        snapshot['spent'] += amount
+        snapshot['entries'] += 1
+        snapshot['balance'] = balances[brand_id]
+    return entries, list(snapshots.values())
+
+
+def _insert_many(table, rows, chunk_size=5000):
+    for start in range(0, len(rows), chunk_size):
+        op.bulk_insert(table, rows[start:start + chunk_size])
+
+
+def upgrade():
+    op.create_table('brand_monthly_spend',
+    sa.Column('brand_id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('spent', sa.Float(), nullable=False),
+    sa.Column('entries', sa.Integer(), nullable=False),
+    sa.Column('balance', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['brand_id'], ['brands.id'], ),
+    sa.PrimaryKeyConstraint('brand_id', 'month')
+    )
+    op.create_table('spend_ledger',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('brand_id', sa.Integer(), nullable=False),
+    sa.Column('campaign_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('episodes', sa.Integer(), nullable=False),
+    sa.Column('rate', sa.Float(), nullable=True),
+    sa.Column('balance', sa.Float(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['brand_id'], ['brands.id'], ),
+    sa.ForeignKeyConstraint(['campaign_id'], ['campaigns.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('spend_ledger', schema=None) as batch_op:
+        batch_op.create_index('ix_spend_ledger_brand_id_created_at', ['brand_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_spend_ledger_campaign_id', ['campaign_id'], unique=False)
+
+    # Open the ledger with what was delivered so far; brands.total_spent was
+    # backfilled with the same amounts by 0005
+    ledger = sa.table(
+        'spend_ledger', *[sa.column(name) for name in (
+            'brand_id', 'campaign_id', 'kind', 'amount', 'episodes', 'rate', 'balance', 'month', 'created_at'
+        )]
+    )
+    snapshots = sa.table('brand_monthly_spend', *[sa.column(name) for name in ('brand_id', 'month', 'spent', 'entries', 'balance')])
+    entries, months = _opening_entries(op.get_bind())
+    _insert_many(ledger, entries)
+    _insert_many(snapshots, months)
+
+
+def downgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('spend_ledger', schema=None) as batch_op:
+        batch_op.drop_index('ix_spend_ledger_campaign_id')
+        batch_op.drop_index('ix_spend_ledger_brand_id_created_at')
+
+    op.drop_table('spend_ledger')
+    op.drop_table('brand_monthly_spend')
+    # ### end Alembic commands ###
@@ -1,8 +1,23 @@
 import os
+import sys
+import click
 from app import create_app, db
 from app.models import User, Podcast, Brand, Campaign, Deal, AdPerformance
 
-app = create_app(os.getenv('FLASK_ENV', 'development'))
+def _lazy_routes():
+    """Whether to defer route registration
+    
+    Defaults to yes for flask CLI commands (init-db, seed-db, shell...), which
+    never serve requests; FLASK_LAZY_ROUTES overrides it either way.
+    """
+    setting = os.getenv('FLASK_LAZY_ROUTES')
+    if setting:
+        return setting.lower() in ('1', 'true', 'yes')
+    # `flask routes` lists the URL map, so it needs the blueprints
+    cli = os.path.basename(sys.argv[0]) == 'flask' or sys.argv[0].endswith(os.path.join('flask', '__main__.py'))
+    return cli and 'routes' not in sys.argv[1:]
+
+app = create_app(os.getenv('FLASK_ENV', 'development'), lazy_routes=_lazy_routes())
 
 @app.shell_context_processor
 def make_shell_context():
@@ -19,10 +34,130 @@ def make_shell_context():
 
 @app.cli.command()
 def init_db():
-    """Initialize the database"""
-    db.create_all()
+    """Initialize the database (same as flask db upgrade)"""
+    from flask_migrate import upgrade
+    upgrade()
     print('Database initialized!')
 
+@app.cli.command()
+def reindex_search():
+    """Rebuild the full-text search index from the podcasts and brands tables"""
+    from app.utils.search import search_index
+    search_index.rebuild()
+    db.session.commit()
+    print('Search index rebuilt!')
+
+@app.cli.command()
+def rebuild_rollups():
+    """Recompute the daily performance rollups from raw ad_performance rows"""
+    from app.utils.rollups import rebuild_rollups as rebuild
+    rebuild()
+    db.session.commit()
+    print('Performance rollups rebuilt!')
+
+@app.cli.command()
+@click.option('--check', is_flag=True, help='Only report drifted counters; exit with an error if any')
+def recount(check):
+    """Recompute the campaign counters and reconcile the spend ledger with the campaigns
+
+    Campaigns the ledger under- or over-charged get an adjustment entry;
+    brand balances and monthly spend snapshots are rebuilt from the ledger.
+    """
+    from app.models import Brand
+    from app.utils.analytics import invalidate_brand_pages, invalidate_user_stats
+    from app.utils.counters import recount_campaigns
+    from app.utils.ledger import reconcile_spend
+    drifted, owners = recount_campaigns(fix=not check)
+    spend_drifted, spend_owners = reconcile_spend(fix=not check)
+    drifted.update(spend_drifted)
+    for name, count in drifted.items():
+        print(f'{name:20} {count} drifted')
+    total = sum(drifted.values())
+    if check:
+        if total:
+            raise SystemExit(f'{total} rows have drifted counters')
+        print('All campaign counters are accurate!')
+        return
+    db.session.commit()
+    invalidate_user_stats(user_ids=owners | spend_owners)
+    if spend_owners:
+        invalidate_brand_pages(*db.session.scalars(
+            db.select(Brand.id).where(Brand.user_id.in_(spend_owners))
+        ))
+    print('Campaign counters recounted!')
+
+@app.cli.command()
+@click.option('--podcasts', type=click.IntRange(min=1), default=1000, show_default=True)
+@click.option('--brands', type=click.IntRange(min=1), default=200, show_default=True)
+@click.option('--campaigns', type=click.IntRange(min=0), default=10000, show_default=True)
+@click.option('--performance', type=click.IntRange(min=0), default=100000, show_default=True,
+              help='AdPerformance rows, one per delivered episode; campaigns are added past --campaigns to reach it')
+@click.option('--seed', type=int, default=42, show_default=True, help='Random seed')
+@click.option('--start', type=click.DateTime(['%Y-%m-%d']), default='2025-01-01', show_default=True,
+              help='First day of the generated activity')
+@click.option('--days', type=click.IntRange(min=1), default=365, show_default=True)
+@click.option('--chunk-size', type=click.IntRange(min=1), default=5000, show_default=True,
+              help='Rows per INSERT batch')
+def seed_scale(podcasts, brands, campaigns, performance, seed, start, days, chunk_size):
+    """Generate a large, reproducible data set for load testing
+
+    E.g. --podcasts 100000 --brands 20000 --campaigns 1000000 --performance 10000000.
+    The same options and seed always produce the same data. Generated users
+    log in with password123.
+    """
+    from app.utils.synthetic import SyntheticData
+    from app.utils.counters import recount_campaigns
+    from app.utils.ledger import reconcile_spend
+    from app.utils.rollups import rebuild_rollups as rebuild
+    from app.utils.search import search_index
+    generator = SyntheticData(seed=seed, start=start.date(), days=days, chunk_size=chunk_size)
+    generator.generate(podcasts, brands, campaigns, performance)
+    recount_campaigns()
+    reconcile_spend()
+    rebuild()
+    search_index.rebuild()
+    db.session.commit()
+    print('Synthetic data generated!')
+
+@app.cli.command()
+def check_indexes():
+    """EXPLAIN each route's hot query and fail if any plan scans a full table"""
+    from app.utils.explain import check_query_plans
+    failures = 0
+    for endpoint, plan, scans in check_query_plans():
+        status = 'FULL SCAN' if scans else 'ok'
+        print(f'{endpoint:40} {status}')
+        for line in scans:
+            print(f'    {line}')
+        failures += bool(scans)
+    if failures:
+        raise SystemExit(f'{failures} queries use a full table scan')
+    print('All hot queries use an index!')
+
+@app.cli.command()
+@click.option('--top', type=click.IntRange(min=1), default=10, show_default=True)
+@click.option('--log', 'path', type=click.Path(dir_okay=False), default=None,
+              help='Slow query log (defaults to SLOW_QUERY_LOG)')
+def slow_queries(top, path):
+    """Summarize the slow query log, worst cumulative time first"""
+    from app.utils.slowlog import read_entries, summarize
+    path = path or app.config['SLOW_QUERY_LOG']
+    if not os.path.exists(path):
+        raise SystemExit(f'No slow query log at {path}')
+    groups = summarize(read_entries(path))
+    for group in groups[:top]:
+        mean = group['total_ms'] / group['count']
+        print(f"[{group['fingerprint']}] {group['count']} x, total {group['total_ms']:.1f} ms, "
+              f"mean {mean:.1f} ms, max {group['max_ms']:.1f} ms")
+        print(f"    {group['statement'][:300]}")
+        origins = ', '.join(f'{origin} ({count})' for origin, count in group['origins'].most_common(3))
+        print(f'    from: {origins}')
+        shapes = ', '.join(shape for shape, _ in group['parameters'].most_common(3))
+        print(f'    parameters: {shapes}')
+        for line in group['plan'] or ():
+            print(f'    | {line}')
+    print(f'{len(groups)} distinct slow queries!')
+
 @app.cli.command()
 def seed_db():
     """Seed the database with sample data"""
@@ -84,6 +219,7 @@ def seed_db():
     
     # Create sample campaign
     from datetime import datetime, timedelta
+    from app.utils.counters import update_campaign_counters
     campaign = Campaign(
         brand_id=brand.id,
         podcast_id=podcast.id,
@@ -102,6 +238,7 @@ def seed_db():
     )
     
     db.session.add(campaign)
+    update_campaign_counters(campaign)
     db.session.commit()
     
     print('Database seeded with sample data!')
@@ -109,4 +246,5 @@ def seed_db():
     print('Brand User: brand@example.com / password123')
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=3000, debug=True)
+    # Development server only; production runs gunicorn -c gunicorn.conf.py wsgi:app
+    app.run(host='0.0.0.0', port=int(os.getenv('PORT', 3000)), debug=app.debug)
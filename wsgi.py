@@ -0,0 +1,5 @@
+import os
+from app import create_app
+
+# WSGI entry point for gunicorn (see gunicorn.conf.py)
+app = create_app(os.getenv('FLASK_ENV', 'production'))